@@ -6,7 +6,7 @@ import requests
 import logging
 from typing import Dict, Any
 from datetime import datetime
-from config import Config
+from config import get_config
 
 
 class AirtableClient:
@@ -14,7 +14,7 @@ class AirtableClient:
     
     def __init__(self):
         """Initialize Airtable client."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         
         if self.config.USE_AIRTABLE and self.config.AIRTABLE_API_KEY:
@@ -5,7 +5,7 @@ Greenhouse API client for fetching job postings.
 import requests
 import logging
 from typing import List, Dict, Any
-from config import Config
+from config import get_config
 
 
 class GreenhouseClient:
@@ -13,7 +13,7 @@ class GreenhouseClient:
     
     def __init__(self):
         """Initialize Greenhouse client."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         self.base_url = "https://api.greenhouse.io/v1"
         
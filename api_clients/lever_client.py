@@ -5,7 +5,7 @@ Lever API client for fetching job postings.
 import requests
 import logging
 from typing import List, Dict, Any
-from config import Config
+from config import get_config
 
 
 class LeverClient:
@@ -13,7 +13,7 @@ class LeverClient:
     
     def __init__(self):
         """Initialize Lever client."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         self.base_url = "https://api.lever.co/v0"
         
@@ -5,11 +5,11 @@ Slack API client for sending job notifications.
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-from config import Config
+from config import get_config
 
 # Optional Slack imports (only if enabled)
 try:
-    config = Config()
+    config = get_config()
     if config.USE_SLACK:
         from slack_sdk import WebClient
         from slack_sdk.errors import SlackApiError
@@ -26,7 +26,7 @@ class SlackClient:
     
     def __init__(self):
         """Initialize Slack client."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         
         if self.config.USE_SLACK and WebClient:
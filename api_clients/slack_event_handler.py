@@ -9,7 +9,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from config import Config
+from config import get_config
 from api_clients.airtable_client import AirtableClient
 
 # Supabase integration imports
@@ -33,7 +33,7 @@ class SlackEventHandler:
     
     def __init__(self):
         """Initialize Slack event handler."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         
         # Optional Slack integration
@@ -4,9 +4,10 @@ Supabase API client for querying companies and job data.
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from supabase import create_client, Client
-from config import Config
+from config import get_config
 
 
 class SupabaseClient:
@@ -14,7 +15,7 @@ class SupabaseClient:
     
     def __init__(self):
         """Initialize Supabase client."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = logging.getLogger(__name__)
         
         # Get Supabase credentials from environment variables
@@ -90,16 +91,16 @@ class SupabaseClient:
     def get_company_names_for_job_fetching(self) -> List[str]:
         """Get company names formatted for job board API calls."""
         try:
-            companies = self.get_all_companies()
+            if not self.client:
+                self.logger.error("Supabase client not initialized")
+                return []
+            
+            # name_normalized is generated by the database (lowercase, no spaces/hyphens)
+            result = self.client.table('companies').select("name_normalized").execute()
+            if not result.data:
+                return []
             
-            # Extract company names and format them for API calls
-            company_names = []
-            for company in companies:
-                name = company.get('name', '')
-                if name:
-                    # Convert to lowercase and replace spaces with hyphens for API compatibility
-                    formatted_name = name.lower().replace(' ', '').replace('-', '')
-                    company_names.append(formatted_name)
+            company_names = [name for name in (row["name_normalized"] for row in result.data) if name]
             
             self.logger.info(f"Retrieved {len(company_names)} company names for job fetching")
             return company_names
@@ -122,9 +123,9 @@ class SupabaseClient:
                 **kwargs
             }
             
-            result = self.client.table('companies').insert(company_data).execute()
+            result = self.client.table('companies').insert(company_data, count="exact", returning="minimal").execute()
             
-            if result.data:
+            if result.count:
                 self.logger.info(f"Successfully added company: {name}")
                 return True
             else:
@@ -142,9 +143,9 @@ class SupabaseClient:
                 self.logger.error("Supabase client not initialized")
                 return False
             
-            result = self.client.table('companies').update(updates).eq('id', company_id).execute()
+            result = self.client.table('companies').update(updates, count="exact", returning="minimal").eq('id', company_id).execute()
             
-            if result.data:
+            if result.count:
                 self.logger.info(f"Successfully updated company ID: {company_id}")
                 return True
             else:
@@ -182,16 +183,17 @@ class SupabaseClient:
             if not self.client:
                 return {"error": "Supabase client not initialized"}
             
-            # Get total count
-            total_result = self.client.table('companies').select("*").execute()
-            total_companies = len(total_result.data)
-            
-            # Get count by worldview tags (as examples)
-            gaming_result = self.client.table('companies').select("*").contains('worldview_tags', ['gaming-first']).execute()
-            gaming_count = len(gaming_result.data)
-            
-            creator_result = self.client.table('companies').select("*").contains('worldview_tags', ['creator-ecosystem']).execute()
-            creator_count = len(creator_result.data)
+            # Header-only counts (no rows transferred), sent concurrently
+            def count_companies(worldview_tag: Optional[str] = None) -> int:
+                query = self.client.table('companies').select("id", count="exact", head=True)
+                if worldview_tag:
+                    query = query.contains('worldview_tags', [worldview_tag])
+                return query.execute().count or 0
+            
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                total_companies, gaming_count, creator_count = executor.map(
+                    count_companies, [None, 'gaming-first', 'creator-ecosystem']
+                )
             
             return {
                 "total_companies": total_companies,
@@ -3,18 +3,44 @@ Human-in-the-Loop API endpoints for SmartApply.
 No Claude/LLM calls - just data persistence and validation.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.routing import APIRoute
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
+from collections import defaultdict
 import uuid
 import re
 import logging
 
-from app.db.supabase_repo import SupabaseRepo
+import orjson
+
+from app.db.async_supabase_repo import AsyncSupabaseRepo
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/human", tags=["human-loop"])
+
+
+class ORJSONRoute(APIRoute):
+    """Route that decodes JSON request bodies with orjson before Pydantic validation."""
+    
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+        
+        async def orjson_route_handler(request: Request):
+            body = await request.body()
+            if body and "json" in request.headers.get("content-type", ""):
+                try:
+                    # Starlette's Request.json() returns the cached _json when present
+                    request._json = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    # Fall through so FastAPI reports the usual decode error
+                    pass
+            return await original_handler(request)
+        
+        return orjson_route_handler
+
+
+router = APIRouter(prefix="/human", tags=["human-loop"], route_class=ORJSONRoute)
 
 
 # Pydantic Models for Request/Response
@@ -24,7 +50,7 @@ class RoleAnalysisRequest(BaseModel):
     user_id: str = Field(..., description="UUID of the user")
     analyst_type: str = Field(default="human", description="Always 'human' for this endpoint")
     overall_fit_score: float = Field(..., ge=0, le=100, description="Overall fit score 0-100")
-    fit_reasoning: str = Field(..., description="Human's fit assessment reasoning")
+    fit_reasoning: str = Field(..., max_length=10_000, description="Human's fit assessment reasoning")
     key_matches: Dict[str, str] = Field(default_factory=dict, description="Key matches found")
     vocabulary_gaps: Dict[str, str] = Field(default_factory=dict, description="Vocabulary translation gaps")
     missing_requirements: List[str] = Field(default_factory=list, description="Missing requirements")
@@ -49,16 +75,16 @@ class ResumeOptimizationRequest(BaseModel):
     """Request model for resume optimization."""
     role_analysis_id: str = Field(..., description="UUID from role analysis")
     master_resume_id: str = Field(..., description="UUID of master resume")
-    optimization_deltas: Dict[str, Any] = Field(default_factory=dict, description="High-level optimization changes")
-    optimization_reasoning: str = Field(..., description="Why these optimizations were made")
-    optimized_resume_text: str = Field(..., description="Full optimized resume text")
+    optimization_deltas: dict = Field(default_factory=dict, description="High-level optimization changes")
+    optimization_reasoning: str = Field(..., max_length=10_000, description="Why these optimizations were made")
+    optimized_resume_text: str = Field(..., max_length=100_000, description="Full optimized resume text")
     optimized_file_url: Optional[str] = Field(None, description="URL to optimized file")
     vocabulary_translations: Dict[str, str] = Field(default_factory=dict, description="Vocabulary mappings used")
     case_studies_highlighted: List[str] = Field(default_factory=list, description="Case study UUIDs highlighted")
     ats_score_estimate: int = Field(..., ge=0, le=100, description="Estimated ATS score")
     human_review_status: str = Field(default="approved", description="Human review status")
     human_review_notes: str = Field(..., description="Human review notes")
-    resume_deltas: List[ResumeDelta] = Field(..., description="Individual bullet changes")
+    resume_deltas: List[ResumeDelta] = Field(..., max_length=500, description="Individual bullet changes")
 
 
 class TranslationEventRequest(BaseModel):
@@ -86,52 +112,65 @@ class ConceptMappingUpsert(BaseModel):
 
 
 # Validation Functions
-def validate_resume_deltas(deltas: List[ResumeDelta], repo: SupabaseRepo) -> None:
+_ALLOWED_OPERATIONS = frozenset(('rephrase', 'reorder', 'emphasize', 'omit'))
+_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?%?')
+# Basic skill keywords check (could be expanded)
+_COMMON_SKILLS = frozenset((
+    'python', 'javascript', 'react', 'typescript', 'sql', 'aws', 'kubernetes',
+    'docker', 'git', 'agile', 'scrum', 'jira', 'confluence', 'figma', 'slack'
+))
+
+
+async def validate_resume_deltas(deltas: List[ResumeDelta], repo: AsyncSupabaseRepo) -> None:
     """Validate resume deltas against business rules."""
-    allowed_operations = {'rephrase', 'reorder', 'emphasize', 'omit'}
-    
+    # Bucket deltas by operation so each rule only visits the deltas it applies to
+    deltas_by_operation = defaultdict(list)
     for delta in deltas:
-        # Check operation is allowed
-        if delta.operation not in allowed_operations:
+        deltas_by_operation[delta.operation].append(delta)
+    
+    # Check operations are allowed
+    invalid_operations = [op for op in deltas_by_operation if op not in _ALLOWED_OPERATIONS]
+    if invalid_operations:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid operation '{invalid_operations[0]}'. Must be one of: {sorted(_ALLOWED_OPERATIONS)}"
+        )
+    
+    # Anti-fabrication check: ensure no new metrics/skills added (rephrase only)
+    for delta in deltas_by_operation['rephrase']:
+        if delta.to_text and _contains_new_metrics_or_skills(delta.from_text, delta.to_text):
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid operation '{delta.operation}'. Must be one of: {allowed_operations}"
+                detail=f"Resume delta appears to add new metrics or skills not in original text"
             )
-        
-        # Verify master bullet exists
-        if not repo.get_master_bullet(delta.master_bullet_id):
+    
+    # Verify master bullets exist with header-only counts; fetch ids only to name a missing one
+    bullet_ids = list(dict.fromkeys(delta.master_bullet_id for delta in deltas))
+    if not bullet_ids or await repo.count_master_bullets(bullet_ids) == len(bullet_ids):
+        return
+    
+    existing_ids = await repo.get_existing_master_bullet_ids(bullet_ids)
+    
+    for bullet_id in bullet_ids:
+        if bullet_id not in existing_ids:
             raise HTTPException(
                 status_code=400,
-                detail=f"Master bullet {delta.master_bullet_id} does not exist"
+                detail=f"Master bullet {bullet_id} does not exist"
             )
-        
-        # Anti-fabrication check: ensure no new metrics/skills added
-        if delta.operation == "rephrase" and delta.to_text:
-            if _contains_new_metrics_or_skills(delta.from_text, delta.to_text):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Resume delta appears to add new metrics or skills not in original text"
-                )
 
 
 def _contains_new_metrics_or_skills(from_text: str, to_text: str) -> bool:
     """Simple check for new numbers or technical skills being added."""
     # Extract numbers from both texts
-    from_numbers = set(re.findall(r'\d+(?:\.\d+)?%?', from_text))
-    to_numbers = set(re.findall(r'\d+(?:\.\d+)?%?', to_text))
+    from_numbers = set(_NUMBER_PATTERN.findall(from_text))
+    to_numbers = set(_NUMBER_PATTERN.findall(to_text))
     
     # If new numbers appear, flag as potential fabrication
     if to_numbers - from_numbers:
         return True
     
-    # Basic skill keywords check (could be expanded)
-    common_skills = {
-        'python', 'javascript', 'react', 'typescript', 'sql', 'aws', 'kubernetes', 
-        'docker', 'git', 'agile', 'scrum', 'jira', 'confluence', 'figma', 'slack'
-    }
-    
-    from_skills = set(word.lower() for word in from_text.split()) & common_skills
-    to_skills = set(word.lower() for word in to_text.split()) & common_skills
+    from_skills = _COMMON_SKILLS.intersection(word.lower() for word in from_text.split())
+    to_skills = _COMMON_SKILLS.intersection(word.lower() for word in to_text.split())
     
     # If new technical skills appear, flag as potential fabrication
     if to_skills - from_skills:
@@ -140,21 +179,21 @@ def _contains_new_metrics_or_skills(from_text: str, to_text: str) -> bool:
     return False
 
 
-# Dependency to get SupabaseRepo
-def get_repo() -> SupabaseRepo:
-    """Get Supabase repository instance."""
-    try:
-        return SupabaseRepo()
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase repo: {e}")
+# Dependency to get the async repository created in the app lifespan
+def get_repo(request: Request) -> AsyncSupabaseRepo:
+    """Get the shared async Supabase repository."""
+    repo = getattr(request.app.state, "repo", None)
+    if repo is None:
+        logger.error("Supabase repo is not initialized")
         raise HTTPException(status_code=500, detail="Database connection failed")
+    return repo
 
 
 # API Endpoints
 @router.post("/role-analysis")
 async def create_role_analysis(
     request: RoleAnalysisRequest,
-    repo: SupabaseRepo = Depends(get_repo)
+    repo: AsyncSupabaseRepo = Depends(get_repo)
 ) -> Dict[str, str]:
     """Create a human role analysis."""
     try:
@@ -163,7 +202,7 @@ async def create_role_analysis(
         uuid.UUID(request.user_id)
         
         # Store in role_analyses table
-        role_analysis_id = repo.store_role_analysis(
+        role_analysis_id = await repo.store_role_analysis(
             job_posting_id=request.job_posting_id,
             user_id=request.user_id,
             analyst_type=request.analyst_type,
@@ -179,20 +218,20 @@ async def create_role_analysis(
             estimated_application_priority=request.estimated_application_priority
         )
         
-        logger.info(f"Created role analysis {role_analysis_id} for job {request.job_posting_id}")
+        logger.info("Created role analysis %s for job %s", role_analysis_id, request.job_posting_id)
         return {"role_analysis_id": role_analysis_id}
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid UUID: {e}")
     except Exception as e:
-        logger.error(f"Error creating role analysis: {e}")
+        logger.error("Error creating role analysis: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create role analysis")
 
 
 @router.post("/resume-optimization")
 async def create_resume_optimization(
     request: ResumeOptimizationRequest,
-    repo: SupabaseRepo = Depends(get_repo)
+    repo: AsyncSupabaseRepo = Depends(get_repo)
 ) -> Dict[str, str]:
     """Create resume optimization with deltas."""
     try:
@@ -200,11 +239,12 @@ async def create_resume_optimization(
         uuid.UUID(request.role_analysis_id)
         uuid.UUID(request.master_resume_id)
         
-        # Validate resume deltas
-        validate_resume_deltas(request.resume_deltas, repo)
+        # Validate resume deltas before storing anything. Not gathered with the insert below:
+        # a failed check would leave an optimization row with no deltas behind
+        await validate_resume_deltas(request.resume_deltas, repo)
         
         # Store resume optimization
-        resume_optimization_id = repo.store_resume_optimization(
+        resume_optimization_id = await repo.store_resume_optimization(
             role_analysis_id=request.role_analysis_id,
             master_resume_id=request.master_resume_id,
             optimization_deltas=request.optimization_deltas,
@@ -218,25 +258,19 @@ async def create_resume_optimization(
             human_review_notes=request.human_review_notes
         )
         
-        # Store resume deltas
-        for delta in request.resume_deltas:
-            repo.store_resume_delta(
-                resume_optimization_id=resume_optimization_id,
-                master_bullet_id=delta.master_bullet_id,
-                operation=delta.operation,
-                from_text=delta.from_text,
-                to_text=delta.to_text,
-                concept_ids=delta.concept_ids,
-                notes=delta.notes
-            )
+        # Store all resume deltas in one insert
+        await repo.store_resume_deltas(
+            resume_optimization_id,
+            [dict(delta) for delta in request.resume_deltas]
+        )
         
-        logger.info(f"Created resume optimization {resume_optimization_id} with {len(request.resume_deltas)} deltas")
+        logger.info("Created resume optimization %s with %s deltas", resume_optimization_id, len(request.resume_deltas))
         return {"resume_optimization_id": resume_optimization_id}
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid UUID: {e}")
     except Exception as e:
-        logger.error(f"Error creating resume optimization: {e}")
+        logger.error("Error creating resume optimization: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create resume optimization")
 
 
@@ -244,7 +278,7 @@ async def create_resume_optimization(
 async def create_translation_event(
     request: TranslationEventRequest,
     mapping_upserts: List[ConceptMappingUpsert] = [],
-    repo: SupabaseRepo = Depends(get_repo)
+    repo: AsyncSupabaseRepo = Depends(get_repo)
 ) -> Dict[str, str]:
     """Create translation event with optional mapping upserts."""
     try:
@@ -254,36 +288,19 @@ async def create_translation_event(
         if request.application_id:
             uuid.UUID(request.application_id)
         
-        # Upsert any new concept mappings first
-        for mapping in mapping_upserts:
-            repo.upsert_concept_mapping(
-                raw_term=mapping.raw_term,
-                concept_id=mapping.concept_id,
-                company_id=mapping.company_id,
-                confidence_score=mapping.confidence_score,
-                successful_match_count=mapping.successful_match_count,
-                user_id=mapping.user_id
-            )
-        
-        # Store translation event
-        translation_event_id = repo.store_translation_event(
-            application_id=request.application_id,
-            role_analysis_id=request.role_analysis_id,
-            user_id=request.user_id,
-            event_type=request.event_type,
-            original_terms=request.original_terms,
-            translated_terms=request.translated_terms,
-            mapping_ids=request.mapping_ids,
-            claude_api_used=request.claude_api_used,
-            api_cost=request.api_cost,
-            processing_time_ms=request.processing_time_ms
+        # Upsert concept mappings and store translation event in one round trip, so there are
+        # no per-mapping calls left to gather
+        # (dict(model) hands over field references without model_dump's deep copy)
+        translation_event_id = await repo.store_translation_event_with_mappings(
+            event=dict(request),
+            mappings=[dict(mapping) for mapping in mapping_upserts]
         )
         
-        logger.info(f"Created translation event {translation_event_id}")
+        logger.info("Created translation event %s", translation_event_id)
         return {"translation_event_id": translation_event_id}
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid UUID: {e}")
     except Exception as e:
-        logger.error(f"Error creating translation event: {e}")
+        logger.error("Error creating translation event: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create translation event")
\ No newline at end of file
@@ -0,0 +1,496 @@
+"""
+Async Supabase repository for the FastAPI write path.
+Mirrors SupabaseRepo on top of the async client so independent requests can overlap;
+row building and batching come from the shared helpers in app.db.supabase_repo.
+
+Deliberately not mirrored, since the human-loop API never calls them and the ingestion
+pipeline uses the sync SupabaseRepo: update_user, upsert_application,
+upsert_concept_mapping, get_or_create_concept_mapping, get_companies_for_job_fetching
+and store_job_analyses.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any, Set
+from datetime import datetime
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+from app.db.supabase_repo import (
+    HTTP_TIMEOUT_SECONDS, HTTP_TIMEOUT, HTTP_POOL_LIMITS, AsyncORJSONHTTPClient, SupabaseRepo,
+    batches, remember_ids, split_company_names, job_posting_rows, resume_delta_rows
+)
+
+# Async clients are bound to the event loop that created them; one per (url, key) is enough
+_ASYNC_CLIENT_CACHE: Dict[tuple, AsyncClient] = {}
+_ASYNC_CLIENT_LOCK = asyncio.Lock()
+
+
+class AsyncSupabaseRepo:
+    """Async repository layer for Supabase database operations."""
+    
+    ID_CACHE_MAX_ENTRIES = SupabaseRepo.ID_CACHE_MAX_ENTRIES
+    JOB_POSTINGS_BATCH_SIZE = SupabaseRepo.JOB_POSTINGS_BATCH_SIZE
+    # IDs per in.(...) filter; 100 UUIDs keep a GET URL near 4 KB, under common proxy limits
+    ID_FILTER_CHUNK_SIZE = 100
+    
+    def __init__(self, sb: AsyncClient):
+        """Wrap an existing async client. Use AsyncSupabaseRepo.create() to build one."""
+        self.logger = logging.getLogger(__name__)
+        self.sb = sb
+        # Table handles hold no per-query state (each select/insert/update builds a fresh request)
+        self._companies = self.sb.table("companies")
+        self._master_bullets = self.sb.table("master_bullets")
+        self._resume_deltas = self.sb.table("resume_deltas")
+        self._resume_optimizations = self.sb.table("resume_optimizations")
+        self._role_analyses = self.sb.table("role_analyses")
+        
+        self._user_id_cache: Dict[str, str] = {}
+        self._company_id_cache: Dict[str, str] = {}
+        self._concept_id_cache: Dict[str, str] = {}
+    
+    @classmethod
+    async def create(cls, url: Optional[str] = None, key: Optional[str] = None) -> "AsyncSupabaseRepo":
+        """Initialize async Supabase repository."""
+        logger = logging.getLogger(__name__)
+        
+        supabase_url = url or os.getenv("SUPABASE_URL")
+        supabase_key = key or os.getenv("SUPABASE_KEY")
+        
+        if not supabase_url or not supabase_key:
+            logger.error("SUPABASE_URL and SUPABASE_KEY are required")
+            raise ValueError("Missing Supabase credentials")
+        
+        try:
+            client_key = (supabase_url, supabase_key)
+            async with _ASYNC_CLIENT_LOCK:
+                client = _ASYNC_CLIENT_CACHE.get(client_key)
+                if client is None:
+                    options = AsyncClientOptions(
+                        postgrest_client_timeout=HTTP_TIMEOUT,
+                        storage_client_timeout=HTTP_TIMEOUT_SECONDS,
+                        httpx_client=AsyncORJSONHTTPClient(timeout=HTTP_TIMEOUT, limits=HTTP_POOL_LIMITS, http2=True)
+                    )
+                    client = await acreate_client(supabase_url, supabase_key, options=options)
+                    _ASYNC_CLIENT_CACHE[client_key] = client
+            logger.info("Async Supabase repository initialized successfully")
+            return cls(client)
+        except Exception as e:
+            logger.error("Failed to initialize async Supabase client: %s", e)
+            raise
+    
+    async def close(self):
+        """Close the shared HTTP pool and drop the cached client (call on app shutdown)."""
+        for client_key, client in list(_ASYNC_CLIENT_CACHE.items()):
+            if client is self.sb:
+                del _ASYNC_CLIENT_CACHE[client_key]
+        await self.sb.postgrest.aclose()
+        self.logger.info("Async Supabase repository closed")
+    
+    async def ping(self, timeout: float = 1.0) -> bool:
+        """Round-trip a trivial SELECT 1 through the ping RPC. Returns False on error or timeout."""
+        try:
+            result = await asyncio.wait_for(self.sb.rpc("ping").execute(), timeout)
+            return result.data == 1
+        except Exception as e:
+            self.logger.warning("Supabase ping failed: %r", e)
+            return False
+    
+    def _remember_ids(self, cache: Dict[str, str], ids: Dict[str, str]) -> None:
+        """Add resolved ids to an id cache, evicting the oldest entries past ID_CACHE_MAX_ENTRIES."""
+        remember_ids(cache, ids, self.ID_CACHE_MAX_ENTRIES)
+    
+    # USER / COMPANY / CONCEPT OPERATIONS
+    async def get_or_create_user(self, email: str, **kwargs) -> str:
+        """Get existing user or create new one. Returns user_id."""
+        if email in self._user_id_cache:
+            return self._user_id_cache[email]
+        
+        try:
+            result = await self.sb.rpc("get_or_create_user", {"p_email": email, "p_attrs": kwargs}).execute()
+            
+            if result.data:
+                self._remember_ids(self._user_id_cache, {email: result.data})
+                return result.data
+            
+            raise Exception("Failed to create user")
+            
+        except Exception as e:
+            self.logger.error("Error getting/creating user %s: %s", email, e)
+            raise
+    
+    async def get_or_create_company(self, name: str, **kwargs) -> str:
+        """Get existing company or create new one. Returns company_id."""
+        if name in self._company_id_cache:
+            return self._company_id_cache[name]
+        
+        try:
+            result = await self.sb.rpc("get_or_create_company", {"p_name": name, "p_attrs": kwargs}).execute()
+            
+            if result.data:
+                self._remember_ids(self._company_id_cache, {name: result.data})
+                return result.data
+            
+            raise Exception("Failed to create company")
+            
+        except Exception as e:
+            self.logger.error("Error getting/creating company %s: %s", name, e)
+            raise
+    
+    async def get_or_create_concept(self, name: str) -> str:
+        """Get existing concept or create new one. Returns concept_id."""
+        if name in self._concept_id_cache:
+            return self._concept_id_cache[name]
+        
+        try:
+            result = await self.sb.rpc("get_or_create_concept", {"p_name": name}).execute()
+            
+            if result.data:
+                self._remember_ids(self._concept_id_cache, {name: result.data})
+                return result.data
+            
+            raise Exception("Failed to create concept")
+            
+        except Exception as e:
+            self.logger.error("Error getting/creating concept %s: %s", name, e)
+            raise
+    
+    async def get_or_create_concepts(self, names: List[str]) -> Dict[str, str]:
+        """Resolve a batch of concepts concurrently. Returns {name: concept_id}."""
+        unique_names = list(dict.fromkeys(names))
+        concept_ids = await asyncio.gather(*(self.get_or_create_concept(name) for name in unique_names))
+        return dict(zip(unique_names, concept_ids))
+    
+    # JOB POSTING OPERATIONS
+    async def store_job_posting(self, company_name: str, role_title: str, job_url: str,
+                                job_description: str, extracted_concepts: List[str] = None,
+                                posted_at: Optional[datetime] = None,
+                                company_id: Optional[str] = None) -> str:
+        """Store job posting. Pass company_id to skip company resolution. Returns job_posting_id."""
+        job_ids = await self.store_job_postings([{
+            "company_name": company_name,
+            "role_title": role_title,
+            "job_url": job_url,
+            "job_description": job_description,
+            "extracted_concepts": extracted_concepts,
+            "posted_at": posted_at,
+            "company_id": company_id
+        }])
+        return job_ids[0]
+    
+    async def store_job_postings(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """Store a batch of job postings with a bulk company upsert and the store_job_postings RPC. Returns job_posting_ids in input order."""
+        if not jobs:
+            return []
+        
+        try:
+            company_ids, missing = split_company_names(jobs, self._company_id_cache)
+            
+            if missing:
+                try:
+                    result = await self._companies.select("id, name").in_("name", list(missing)).execute()
+                    company_ids.update({row["name"]: row["id"] for row in result.data or []})
+                    
+                    new_names = missing - company_ids.keys()
+                    if new_names:
+                        result = await self._companies.upsert(
+                            [{"name": name} for name in new_names], on_conflict="name"
+                        ).execute()
+                        company_ids.update({row["name"]: row["id"] for row in result.data or []})
+                        self.logger.info("Created %s new companies", len(new_names))
+                    
+                    self._remember_ids(self._company_id_cache, company_ids)
+                except Exception as e:
+                    self.logger.warning("Could not resolve companies %s: %s", sorted(missing), e)
+            
+            rows = job_posting_rows(jobs, company_ids)
+            
+            # Chunked so a large fetch cycle stays within PostgREST's request size limits
+            job_ids = {}
+            for batch in batches(rows, self.JOB_POSTINGS_BATCH_SIZE):
+                # Server-side upsert keeps stored posted_at/company_id/role columns when a row has none
+                result = await self.sb.rpc("store_job_postings", {"p_jobs": batch}).execute()
+                job_ids.update({row["job_url"]: row["id"] for row in result.data or []})
+            
+            if len(job_ids) == len(rows):
+                self.logger.info("Stored %s job postings", len(job_ids))
+                return [job_ids[job["job_url"]] for job in jobs]
+            
+            raise Exception("Failed to store job postings")
+            
+        except Exception as e:
+            self.logger.error("Error storing %s job postings: %s", len(jobs), e)
+            raise
+    
+    async def store_job_analysis(self, company_name: str, role_title: str, job_url: str,
+                                 job_description: str, fit_score: float, reasoning: str,
+                                 vocabulary_gaps: List[str] = None,
+                                 optimization_strategy: str = None) -> str:
+        """Store job posting and analysis. Returns analysis_id."""
+        try:
+            # Company lookup, posting upsert and analysis insert run as one server-side transaction
+            result = await self.sb.rpc("store_job_analysis", {
+                "p_company_name": company_name,
+                "p_role_title": role_title,
+                "p_job_url": job_url,
+                "p_job_description": job_description,
+                "p_fit_score": fit_score,
+                "p_reasoning": reasoning,
+                "p_vocabulary_gaps": vocabulary_gaps or [],
+                "p_optimization_strategy": optimization_strategy
+            }).execute()
+            
+            if result.data:
+                self.logger.info("Stored job analysis for %s: fit_score=%s", role_title, fit_score)
+                return result.data
+            
+            raise Exception("Failed to store job analysis")
+            
+        except Exception as e:
+            self.logger.error("Error storing job analysis for %s: %s", job_url, e)
+            raise
+    
+    # HUMAN-IN-THE-LOOP OPERATIONS
+    async def store_role_analysis(self, job_posting_id: str, user_id: str, analyst_type: str,
+                                  overall_fit_score: float, fit_reasoning: str,
+                                  key_matches: Dict[str, str], vocabulary_gaps: Dict[str, str],
+                                  missing_requirements: List[str], red_flags: str,
+                                  optimization_strategy: str, resume_version_recommended: str,
+                                  confidence_level: int, estimated_application_priority: str) -> str:
+        """Store role analysis from human analyst. Returns role_analysis_id."""
+        try:
+            analysis_data = {
+                "job_posting_id": job_posting_id,
+                "user_id": user_id,
+                "analyst_type": analyst_type,
+                "overall_fit_score": overall_fit_score,
+                "fit_reasoning": fit_reasoning,
+                "key_matches": key_matches,
+                "vocabulary_gaps": vocabulary_gaps,
+                "missing_requirements": missing_requirements,
+                "red_flags": red_flags,
+                "optimization_strategy": optimization_strategy,
+                "resume_version_recommended": resume_version_recommended,
+                "confidence_level": confidence_level,
+                "estimated_application_priority": estimated_application_priority
+            }
+            
+            result = await self._role_analyses.insert(analysis_data).execute()
+            
+            if result.data:
+                return result.data[0]["id"]
+            
+            raise Exception("Failed to store role analysis")
+            
+        except Exception as e:
+            self.logger.error("Error storing role analysis: %s", e)
+            raise
+    
+    async def store_resume_optimization(self, role_analysis_id: str, master_resume_id: str,
+                                        optimization_deltas: Dict[str, Any], optimization_reasoning: str,
+                                        optimized_resume_text: str, optimized_file_url: Optional[str],
+                                        vocabulary_translations: Dict[str, str],
+                                        case_studies_highlighted: List[str], ats_score_estimate: float,
+                                        human_review_status: str, human_review_notes: str) -> str:
+        """Store resume optimization. Returns resume_optimization_id."""
+        try:
+            optimization_data = {
+                "role_analysis_id": role_analysis_id,
+                "master_resume_id": master_resume_id,
+                "optimization_deltas": optimization_deltas,
+                "optimization_reasoning": optimization_reasoning,
+                "optimized_resume_text": optimized_resume_text,
+                "optimized_file_url": optimized_file_url,
+                "vocabulary_translations": vocabulary_translations,
+                "case_studies_highlighted": case_studies_highlighted,
+                "ats_score_estimate": ats_score_estimate,
+                "human_review_status": human_review_status,
+                "human_review_notes": human_review_notes
+            }
+            
+            result = await self._resume_optimizations.insert(optimization_data).execute()
+            
+            if result.data:
+                return result.data[0]["id"]
+            
+            raise Exception("Failed to store resume optimization")
+            
+        except Exception as e:
+            self.logger.error("Error storing resume optimization: %s", e)
+            raise
+    
+    async def store_resume_delta(self, resume_optimization_id: str, master_bullet_id: str,
+                                 operation: str, from_text: str, to_text: Optional[str],
+                                 concept_ids: List[str], notes: str) -> str:
+        """Store individual resume delta. Returns resume_delta_id."""
+        delta_ids = await self.store_resume_deltas(resume_optimization_id, [{
+            "master_bullet_id": master_bullet_id,
+            "operation": operation,
+            "from_text": from_text,
+            "to_text": to_text,
+            "concept_ids": concept_ids,
+            "notes": notes
+        }])
+        return delta_ids[0]
+    
+    async def store_resume_deltas(self, resume_optimization_id: str, deltas: List[Dict[str, Any]]) -> List[str]:
+        """Store all deltas of a resume optimization in one insert. Returns resume_delta_ids in input order."""
+        if not deltas:
+            return []
+        
+        try:
+            delta_rows = resume_delta_rows(resume_optimization_id, deltas)
+            
+            # Single statement, so either every delta is stored or none are
+            result = await self._resume_deltas.insert(delta_rows).execute()
+            
+            if result.data and len(result.data) == len(delta_rows):
+                return [row["id"] for row in result.data]
+            
+            raise Exception("Failed to store resume deltas")
+            
+        except Exception as e:
+            self.logger.error("Error storing %s resume deltas: %s", len(deltas), e)
+            raise
+    
+    async def get_master_bullet(self, bullet_id: str, fields: str = "*") -> Optional[Dict[str, Any]]:
+        """Get master bullet by ID. Pass fields to fetch only the columns the caller needs."""
+        try:
+            result = await self._master_bullets.select(fields).eq("id", bullet_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            self.logger.error("Error getting master bullet %s: %s", bullet_id, e)
+            return None
+    
+    def _id_chunks(self, ids: List[str]) -> List[List[str]]:
+        """Split ids into ID_FILTER_CHUNK_SIZE slices for in.(...) filters."""
+        return list(batches(ids, self.ID_FILTER_CHUNK_SIZE))
+    
+    async def count_master_bullets(self, bullet_ids: List[str]) -> int:
+        """Count how many of bullet_ids exist. HEAD requests only, so no rows are returned."""
+        try:
+            results = await asyncio.gather(*(
+                self._master_bullets.select("id", count="exact", head=True).in_("id", chunk).execute()
+                for chunk in self._id_chunks(bullet_ids)
+            ))
+            return sum(result.count or 0 for result in results)
+        except Exception as e:
+            self.logger.error("Error counting master bullets: %s", e)
+            raise
+    
+    async def get_existing_master_bullet_ids(self, bullet_ids: List[str]) -> Set[str]:
+        """Return the subset of bullet_ids that exist."""
+        try:
+            results = await asyncio.gather(*(
+                self._master_bullets.select("id").in_("id", chunk).execute()
+                for chunk in self._id_chunks(bullet_ids)
+            ))
+            return {row["id"] for result in results for row in result.data or []}
+        except Exception as e:
+            self.logger.error("Error looking up master bullets: %s", e)
+            raise
+    
+    # LEARNING/TRANSLATION OPERATIONS
+    async def store_translation_event(self, application_id: Optional[str], role_analysis_id: str,
+                                      user_id: str, event_type: str, original_terms: List[str],
+                                      translated_terms: List[str], mapping_ids: List[str],
+                                      claude_api_used: bool, api_cost: float,
+                                      processing_time_ms: int) -> str:
+        """Store translation event. Returns translation_event_id."""
+        try:
+            event_data = {
+                "application_id": application_id,
+                "role_analysis_id": role_analysis_id,
+                "user_id": user_id,
+                "event_type": event_type,
+                "original_terms": original_terms,
+                "translated_terms": translated_terms,
+                "claude_api_used": claude_api_used,
+                "api_cost": api_cost,
+                "processing_time_ms": processing_time_ms,
+                "mapping_ids": mapping_ids
+            }
+            
+            # Event insert and mapping links go out as one statement (no mapping upserts here)
+            result = await self.sb.rpc("store_translation_event_with_mappings", {
+                "p_event": event_data,
+                "p_mappings": []
+            }).execute()
+            
+            if result.data:
+                return result.data
+            
+            raise Exception("Failed to store translation event")
+            
+        except Exception as e:
+            self.logger.error("Error storing translation event: %s", e)
+            raise
+    
+    async def store_translation_event_with_mappings(self, event: Dict[str, Any],
+                                                    mappings: List[Dict[str, Any]]) -> str:
+        """
+        Upsert concept mappings and store translation event in one round trip.
+        Returns translation_event_id.
+        """
+        try:
+            result = await self.sb.rpc("store_translation_event_with_mappings", {
+                "p_event": event,
+                "p_mappings": mappings
+            }).execute()
+            
+            if result.data:
+                return result.data
+            
+            raise Exception("Failed to store translation event")
+            
+        except Exception as e:
+            self.logger.error("Error storing translation event with mappings: %s", e)
+            raise
+    
+    async def record_translation_event(self, concept_mapping_id: str, application_id: str,
+                                       event_type: str = "success") -> str:
+        """Record a translation learning event. Returns event_id."""
+        try:
+            # Event insert and success counter bump run as one server-side transaction
+            result = await self.sb.rpc("record_translation_event", {
+                "p_concept_mapping_id": concept_mapping_id,
+                "p_application_id": application_id,
+                "p_event_type": event_type
+            }).execute()
+            
+            if result.data:
+                self.logger.info("Recorded translation event: %s", event_type)
+                return result.data
+            
+            raise Exception("Failed to record translation event")
+            
+        except Exception as e:
+            self.logger.error("Error recording translation event: %s", e)
+            raise
+    
+    async def increment_concept_mapping_success(self, concept_mapping_id: str) -> bool:
+        """Increment successful match count for a concept mapping."""
+        try:
+            result = await self.sb.rpc("increment_match_count", {"mapping_id": concept_mapping_id}).execute()
+            
+            if result.data is None:
+                self.logger.warning("Concept mapping %s not found; match count not incremented", concept_mapping_id)
+                return False
+            
+            self.logger.info("Incremented concept mapping success count for %s to %s", concept_mapping_id, result.data)
+            return True
+            
+        except Exception as e:
+            self.logger.error("Error incrementing concept mapping success: %s", e)
+            return False
+    
+    # ANALYTICS OPERATIONS
+    async def get_database_stats(self) -> Dict[str, Any]:
+        """Get comprehensive database statistics."""
+        try:
+            result = await self.sb.rpc("database_stats").execute()
+            return result.data or {}
+            
+        except Exception as e:
+            self.logger.error("Error getting database stats: %s", e)
+            return {"error": str(e)}
@@ -4,15 +4,142 @@ Handles all database operations with proper error handling and logging.
 """
 
 import os
+import time
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 from datetime import datetime
-from supabase import create_client, Client
+import httpx
+import orjson
+from supabase import create_client, Client, ClientOptions
+
+# One client per (url, key) for the whole process, so repos built per request reuse its connections
+_CLIENT_CACHE: Dict[tuple, Client] = {}
+_CLIENT_LOCK = threading.Lock()
+
+# Stay well under Supabase's per-project connection caps; HTTP/2 multiplexes requests over these
+HTTP_TIMEOUT_SECONDS = 20
+HTTP_CONNECT_TIMEOUT_SECONDS = 2
+HTTP_TIMEOUT = httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=10, max_connections=15, keepalive_expiry=30.0)
+# Methods safe to resend when a pooled connection turns out to be closed by the server
+_RETRYABLE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+# Row building and batching shared by SupabaseRepo and AsyncSupabaseRepo; only the I/O differs
+def batches(rows: List[Any], size: int) -> Iterator[List[Any]]:
+    """Yield consecutive slices of at most size rows."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def remember_ids(cache: Dict[str, str], ids: Dict[str, str], max_entries: int) -> None:
+    """Add resolved ids to an id cache, evicting the oldest entries past max_entries."""
+    cache.update(ids)
+    while len(cache) > max_entries:
+        del cache[next(iter(cache))]
+
+
+def split_company_names(jobs: List[Dict[str, Any]], cache: Dict[str, str]) -> Tuple[Dict[str, str], Set[str]]:
+    """Return ({name: company_id} from the cache, names still to resolve) for jobs without a company_id."""
+    company_names = {job["company_name"] for job in jobs
+                     if job.get("company_name") and not job.get("company_id")}
+    company_ids = {name: cache[name] for name in company_names if name in cache}
+    return company_ids, company_names - company_ids.keys()
+
+
+def job_posting_rows(jobs: List[Dict[str, Any]], company_ids: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Build store_job_postings rows, one per job_url (ON CONFLICT cannot touch the same row twice in a statement)."""
+    rows = {}
+    for job in jobs:
+        posted_at = job.get("posted_at")
+        rows[job["job_url"]] = {
+            "company_name": job.get("company_name"),
+            "role_title": job.get("role_title"),
+            "job_url": job["job_url"],
+            "job_description": job.get("job_description"),
+            "company_id": job.get("company_id") or company_ids.get(job.get("company_name")),
+            "extracted_concepts": job.get("extracted_concepts") or [],
+            "posted_at": posted_at.isoformat() if posted_at else None
+        }
+    return list(rows.values())
+
+
+def job_analysis_rows(analyses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build store_job_analyses rows; keys match store_job_analysis."""
+    return [{
+        "company_name": analysis.get("company_name"),
+        "role_title": analysis.get("role_title"),
+        "job_url": analysis.get("job_url"),
+        "job_description": analysis.get("job_description"),
+        "fit_score": analysis.get("fit_score"),
+        "reasoning": analysis.get("reasoning"),
+        "vocabulary_gaps": analysis.get("vocabulary_gaps") or [],
+        "optimization_strategy": analysis.get("optimization_strategy")
+    } for analysis in analyses]
+
+
+def resume_delta_rows(resume_optimization_id: str, deltas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build resume_deltas rows for one resume optimization."""
+    return [{
+        "resume_optimization_id": resume_optimization_id,
+        "master_bullet_id": delta["master_bullet_id"],
+        "operation": delta["operation"],
+        "from_text": delta["from_text"],
+        "to_text": delta.get("to_text"),
+        "concept_ids": delta.get("concept_ids") or [],
+        "notes": delta.get("notes", "")
+    } for delta in deltas]
+
+
+class _ORJSONRequestMixin:
+    """Encode request bodies with orjson instead of httpx's stdlib json.dumps."""
+    
+    def build_request(self, method, url, *, json=None, content=None, headers=None, **kwargs):
+        if json is not None and content is None:
+            content = orjson.dumps(json)
+            headers = httpx.Headers(headers)
+            headers["Content-Type"] = "application/json"
+        return super().build_request(method, url, content=content, headers=headers, **kwargs)
+
+
+class ORJSONHTTPClient(_ORJSONRequestMixin, httpx.Client):
+    """httpx.Client for PostgREST calls with orjson request encoding."""
+    
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except httpx.RemoteProtocolError:
+            # Stale keep-alive connection; httpx drops it, so one retry gets a fresh one
+            if request.method not in _RETRYABLE_METHODS:
+                raise
+            return super().send(request, **kwargs)
+
+
+class AsyncORJSONHTTPClient(_ORJSONRequestMixin, httpx.AsyncClient):
+    """httpx.AsyncClient for PostgREST calls with orjson request encoding."""
+    
+    async def send(self, request, **kwargs):
+        try:
+            return await super().send(request, **kwargs)
+        except httpx.RemoteProtocolError:
+            if request.method not in _RETRYABLE_METHODS:
+                raise
+            return await super().send(request, **kwargs)
 
 
 class SupabaseRepo:
     """Repository layer for all Supabase database operations."""
     
+    # The company list only changes when companies are added, so scheduler ticks can reuse it
+    COMPANIES_CACHE_TTL_SECONDS = 300
+    # Upper bound per get_or_create_* id cache so long-lived API workers don't grow without limit
+    ID_CACHE_MAX_ENTRIES = 4096
+    # Rows per store_job_postings RPC call
+    JOB_POSTINGS_BATCH_SIZE = 500
+    # Analyses per store_job_analyses RPC call (each row carries a full job description)
+    JOB_ANALYSES_BATCH_SIZE = 100
+    
     def __init__(self, url: Optional[str] = None, key: Optional[str] = None):
         """Initialize Supabase repository."""
         self.logger = logging.getLogger(__name__)
@@ -25,114 +152,143 @@ class SupabaseRepo:
             self.logger.error("SUPABASE_URL and SUPABASE_KEY are required")
             raise ValueError("Missing Supabase credentials")
         
+        # get_or_create_* ids never change once created, so cache them for the repo's lifetime
+        self._user_id_cache: Dict[str, str] = {}
+        self._company_id_cache: Dict[str, str] = {}
+        self._concept_id_cache: Dict[str, str] = {}
+        self._id_cache_lock = threading.Lock()
+        self._companies_cache: Optional[tuple] = None
+        
         try:
-            self.sb: Client = create_client(self.supabase_url, self.supabase_key)
+            client_key = (self.supabase_url, self.supabase_key)
+            with _CLIENT_LOCK:
+                client = _CLIENT_CACHE.get(client_key)
+                if client is None:
+                    options = ClientOptions(
+                        postgrest_client_timeout=HTTP_TIMEOUT,
+                        storage_client_timeout=HTTP_TIMEOUT_SECONDS,
+                        httpx_client=ORJSONHTTPClient(timeout=HTTP_TIMEOUT, limits=HTTP_POOL_LIMITS, http2=True)
+                    )
+                    client = create_client(self.supabase_url, self.supabase_key, options=options)
+                    _CLIENT_CACHE[client_key] = client
+            self.sb: Client = client
+            # Table handles hold no per-query state (each select/insert/update builds a fresh request)
+            self._applications = self.sb.table("applications")
+            self._companies = self.sb.table("companies")
+            self._concept_mappings = self.sb.table("concept_mappings")
+            self._master_bullets = self.sb.table("master_bullets")
+            self._resume_deltas = self.sb.table("resume_deltas")
+            self._resume_optimizations = self.sb.table("resume_optimizations")
+            self._role_analyses = self.sb.table("role_analyses")
+            self._users = self.sb.table("users")
             self.logger.info("Supabase repository initialized successfully")
         except Exception as e:
-            self.logger.error(f"Failed to initialize Supabase client: {str(e)}")
+            self.logger.error("Failed to initialize Supabase client: %s", e)
             raise
     
+    def _remember_ids(self, cache: Dict[str, str], ids: Dict[str, str]) -> None:
+        """Add resolved ids to an id cache, evicting the oldest entries past ID_CACHE_MAX_ENTRIES."""
+        with self._id_cache_lock:
+            remember_ids(cache, ids, self.ID_CACHE_MAX_ENTRIES)
+    
     # USER OPERATIONS
     def get_or_create_user(self, email: str, **kwargs) -> str:
         """Get existing user or create new one. Returns user_id."""
+        cached_id = self._user_id_cache.get(email)
+        if cached_id:
+            return cached_id
+        
         try:
-            # Try to find existing user
-            result = self.sb.table("users").select("id").eq("email", email).execute()
-            
-            if result.data:
-                return result.data[0]["id"]
-            
-            # Create new user
-            user_data = {"email": email, **kwargs}
-            result = self.sb.table("users").insert(user_data).execute()
+            result = self.sb.rpc("get_or_create_user", {"p_email": email, "p_attrs": kwargs}).execute()
             
             if result.data:
-                self.logger.info(f"Created new user: {email}")
-                return result.data[0]["id"]
+                self._remember_ids(self._user_id_cache, {email: result.data})
+                return result.data
             
             raise Exception("Failed to create user")
             
         except Exception as e:
-            self.logger.error(f"Error getting/creating user {email}: {str(e)}")
+            self.logger.error("Error getting/creating user %s: %s", email, e)
             raise
     
     def update_user(self, user_id: str, **updates) -> bool:
         """Update user information."""
         try:
-            result = self.sb.table("users").update(updates).eq("id", user_id).execute()
-            return bool(result.data)
+            # Only the matched-row count is needed, so skip shipping the updated row back
+            result = self._users.update(updates, count="exact", returning="minimal").eq("id", user_id).execute()
+            
+            if "email" in updates:
+                with self._id_cache_lock:
+                    for email, cached_id in list(self._user_id_cache.items()):
+                        if cached_id == user_id:
+                            del self._user_id_cache[email]
+            
+            return bool(result.count)
         except Exception as e:
-            self.logger.error(f"Error updating user {user_id}: {str(e)}")
+            self.logger.error("Error updating user %s: %s", user_id, e)
             return False
     
     # COMPANY OPERATIONS
     def get_or_create_company(self, name: str, **kwargs) -> str:
         """Get existing company or create new one. Returns company_id."""
+        cached_id = self._company_id_cache.get(name)
+        if cached_id:
+            return cached_id
+        
         try:
-            # Try to find existing company
-            result = self.sb.table("companies").select("id").eq("name", name).execute()
-            
-            if result.data:
-                return result.data[0]["id"]
-            
-            # Create new company
-            company_data = {"name": name, **kwargs}
-            result = self.sb.table("companies").insert(company_data).execute()
+            result = self.sb.rpc("get_or_create_company", {"p_name": name, "p_attrs": kwargs}).execute()
             
             if result.data:
-                self.logger.info(f"Created new company: {name}")
-                return result.data[0]["id"]
+                self._remember_ids(self._company_id_cache, {name: result.data})
+                return result.data
             
             raise Exception("Failed to create company")
             
         except Exception as e:
-            self.logger.error(f"Error getting/creating company {name}: {str(e)}")
+            self.logger.error("Error getting/creating company %s: %s", name, e)
             raise
     
     def get_companies_for_job_fetching(self) -> List[str]:
         """Get list of company names for job fetching APIs."""
+        if self._companies_cache and time.monotonic() - self._companies_cache[0] < self.COMPANIES_CACHE_TTL_SECONDS:
+            return self._companies_cache[1]
+        
         try:
-            result = self.sb.table("companies").select("name").execute()
+            # name_normalized is generated by the database in the format the job APIs expect
+            result = self._companies.select("name_normalized").execute()
             
-            if result.data:
-                company_names = []
-                for company in result.data:
-                    name = company.get('name', '')
-                    if name:
-                        # Format for API compatibility
-                        formatted_name = name.lower().replace(' ', '').replace('-', '')
-                        company_names.append(formatted_name)
-                
-                self.logger.info(f"Retrieved {len(company_names)} companies for job fetching")
-                return company_names
+            rows = result.data
+            if not rows:
+                return []
             
-            return []
+            company_names = [name for name in (row["name_normalized"] for row in rows) if name]
+            self._companies_cache = (time.monotonic(), company_names)
+            
+            self.logger.info("Retrieved %s companies for job fetching", len(company_names))
+            return company_names
             
         except Exception as e:
-            self.logger.error(f"Error fetching companies: {str(e)}")
+            self.logger.error("Error fetching companies: %s", e)
             return []
     
     # CONCEPT OPERATIONS
     def get_or_create_concept(self, name: str) -> str:
         """Get existing concept or create new one. Returns concept_id."""
+        cached_id = self._concept_id_cache.get(name)
+        if cached_id:
+            return cached_id
+        
         try:
-            # Try to find existing concept
-            result = self.sb.table("concepts").select("id").eq("name", name).execute()
-            
-            if result.data:
-                return result.data[0]["id"]
-            
-            # Create new concept
-            result = self.sb.table("concepts").insert({"name": name}).execute()
+            result = self.sb.rpc("get_or_create_concept", {"p_name": name}).execute()
             
             if result.data:
-                self.logger.info(f"Created new concept: {name}")
-                return result.data[0]["id"]
+                self._remember_ids(self._concept_id_cache, {name: result.data})
+                return result.data
             
             raise Exception("Failed to create concept")
             
         except Exception as e:
-            self.logger.error(f"Error getting/creating concept {name}: {str(e)}")
+            self.logger.error("Error getting/creating concept %s: %s", name, e)
             raise
     
     def get_or_create_concept_mapping(self, raw_term: str, concept_name: str, 
@@ -141,86 +297,85 @@ class SupabaseRepo:
                                     company_id: Optional[str] = None) -> str:
         """Get or create concept mapping. Returns mapping_id."""
         try:
-            # Get concept_id
-            concept_id = self.get_or_create_concept(concept_name)
-            
-            # Try to find existing mapping
-            result = self.sb.table("concept_mappings").select("id").eq("raw_term", raw_term).eq("concept_id", concept_id).execute()
+            # Concept and mapping are resolved server-side in one round trip
+            result = self.sb.rpc("get_or_create_concept_mapping", {
+                "p_raw_term": raw_term,
+                "p_concept_name": concept_name,
+                "p_confidence_score": confidence_score,
+                "p_user_id": user_id,
+                "p_company_id": company_id
+            }).execute()
             
             if result.data:
-                return result.data[0]["id"]
-            
-            # Create new mapping
-            mapping_data = {
-                "raw_term": raw_term,
-                "concept_id": concept_id,
-                "confidence_score": confidence_score,
-                "user_id": user_id,
-                "company_id": company_id
-            }
-            
-            result = self.sb.table("concept_mappings").insert(mapping_data).execute()
-            
-            if result.data:
-                self.logger.info(f"Created concept mapping: {raw_term} -> {concept_name}")
-                return result.data[0]["id"]
+                return result.data
             
             raise Exception("Failed to create concept mapping")
             
         except Exception as e:
-            self.logger.error(f"Error creating concept mapping {raw_term}: {str(e)}")
+            self.logger.error("Error creating concept mapping %s: %s", raw_term, e)
             raise
     
     # JOB POSTING OPERATIONS
     def store_job_posting(self, company_name: str, role_title: str, job_url: str,
                          job_description: str, extracted_concepts: List[str] = None,
-                         posted_at: Optional[datetime] = None) -> str:
-        """Store job posting. Returns job_posting_id."""
+                         posted_at: Optional[datetime] = None,
+                         company_id: Optional[str] = None) -> str:
+        """Store job posting. Pass company_id to skip company resolution. Returns job_posting_id."""
+        job_ids = self.store_job_postings([{
+            "company_name": company_name,
+            "role_title": role_title,
+            "job_url": job_url,
+            "job_description": job_description,
+            "extracted_concepts": extracted_concepts,
+            "posted_at": posted_at,
+            "company_id": company_id
+        }])
+        return job_ids[0]
+    
+    def store_job_postings(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """Store a batch of job postings with a bulk company upsert and the store_job_postings RPC. Returns job_posting_ids in input order."""
+        if not jobs:
+            return []
+        
         try:
-            # Get or create company
-            company_id = None
-            if company_name:
+            # Resolve every distinct company at once instead of per job
+            company_ids, missing = split_company_names(jobs, self._company_id_cache)
+            
+            if missing:
                 try:
-                    company_id = self.get_or_create_company(company_name)
+                    result = self._companies.select("id, name").in_("name", list(missing)).execute()
+                    company_ids.update({row["name"]: row["id"] for row in result.data or []})
+                    
+                    new_names = missing - company_ids.keys()
+                    if new_names:
+                        result = self._companies.upsert(
+                            [{"name": name} for name in new_names], on_conflict="name"
+                        ).execute()
+                        company_ids.update({row["name"]: row["id"] for row in result.data or []})
+                        self._companies_cache = None
+                        self.logger.info("Created %s new companies", len(new_names))
+                    
+                    self._remember_ids(self._company_id_cache, company_ids)
                 except Exception as e:
-                    self.logger.warning(f"Could not create company {company_name}: {e}")
+                    self.logger.warning("Could not resolve companies %s: %s", sorted(missing), e)
             
-            # Check if job already exists
-            result = self.sb.table("job_postings").select("id").eq("job_url", job_url).execute()
-            
-            if result.data:
-                # Update existing job
-                job_id = result.data[0]["id"]
-                updates = {
-                    "job_description": job_description,
-                    "extracted_concepts": extracted_concepts or [],
-                    "updated_at": datetime.now().isoformat()
-                }
-                self.sb.table("job_postings").update(updates).eq("id", job_id).execute()
-                return job_id
-            
-            # Create new job posting
-            job_data = {
-                "company_name": company_name,
-                "role_title": role_title,
-                "job_url": job_url,
-                "job_description": job_description,
-                "company_id": company_id,
-                "extracted_concepts": extracted_concepts or [],
-                "posted_at": posted_at.isoformat() if posted_at else None
-            }
+            rows = job_posting_rows(jobs, company_ids)
             
-            result = self.sb.table("job_postings").insert(job_data).execute()
+            # Chunked so a large fetch cycle stays within PostgREST's request size limits
+            job_ids = {}
+            for batch in batches(rows, self.JOB_POSTINGS_BATCH_SIZE):
+                # Server-side upsert keeps stored posted_at/company_id/role columns when a row has none
+                result = self.sb.rpc("store_job_postings", {"p_jobs": batch}).execute()
+                job_ids.update({row["job_url"]: row["id"] for row in result.data or []})
             
-            if result.data:
-                job_id = result.data[0]["id"]
-                self.logger.info(f"Stored job posting: {role_title} at {company_name}")
-                return job_id
+            if len(job_ids) == len(rows):
+                self.logger.info("Stored %s job postings", len(job_ids))
+                return [job_ids[job["job_url"]] for job in jobs]
             
-            raise Exception("Failed to store job posting")
+            raise Exception("Failed to store job postings")
             
         except Exception as e:
-            self.logger.error(f"Error storing job posting {job_url}: {str(e)}")
+            self.logger.error("Error storing %s job postings: %s", len(jobs), e)
             raise
     
     def store_job_analysis(self, company_name: str, role_title: str, job_url: str,
@@ -229,36 +384,51 @@ class SupabaseRepo:
                           optimization_strategy: str = None) -> str:
         """Store job posting and analysis. Returns analysis_id."""
         try:
-            # Store job posting first
-            job_posting_id = self.store_job_posting(
-                company_name=company_name,
-                role_title=role_title,
-                job_url=job_url,
-                job_description=job_description
-            )
-            
-            # Store role analysis
-            analysis_data = {
-                "job_posting_id": job_posting_id,
-                "fit_score": fit_score,
-                "reasoning": reasoning,
-                "vocabulary_gaps": vocabulary_gaps or [],
-                "optimization_strategy": optimization_strategy
-            }
-            
-            result = self.sb.table("role_analysis").insert(analysis_data).execute()
+            # Company lookup, posting upsert and analysis insert run as one server-side transaction
+            result = self.sb.rpc("store_job_analysis", {
+                "p_company_name": company_name,
+                "p_role_title": role_title,
+                "p_job_url": job_url,
+                "p_job_description": job_description,
+                "p_fit_score": fit_score,
+                "p_reasoning": reasoning,
+                "p_vocabulary_gaps": vocabulary_gaps or [],
+                "p_optimization_strategy": optimization_strategy
+            }).execute()
             
             if result.data:
-                analysis_id = result.data[0]["id"]
-                self.logger.info(f"Stored job analysis for {role_title}: fit_score={fit_score}")
-                return analysis_id
+                self.logger.info("Stored job analysis for %s: fit_score=%s", role_title, fit_score)
+                return result.data
             
             raise Exception("Failed to store job analysis")
             
         except Exception as e:
-            self.logger.error(f"Error storing job analysis for {job_url}: {str(e)}")
+            self.logger.error("Error storing job analysis for %s: %s", job_url, e)
             raise
     
+    def store_job_analyses(self, analyses: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Store a batch of job analyses. Keys match store_job_analysis; returns analysis_ids in input order, None where a row failed."""
+        if not analyses:
+            return []
+        
+        rows = job_analysis_rows(analyses)
+        
+        # Rows fail independently server-side; a failed request only loses its own chunk
+        analysis_ids = []
+        for batch in batches(rows, self.JOB_ANALYSES_BATCH_SIZE):
+            try:
+                result = self.sb.rpc("store_job_analyses", {"p_analyses": batch}).execute()
+                if not isinstance(result.data, list) or len(result.data) != len(batch):
+                    raise Exception("Unexpected store_job_analyses response")
+                analysis_ids.extend(result.data)
+            except Exception as e:
+                self.logger.error("Error storing %s job analyses: %s", len(batch), e)
+                analysis_ids.extend([None] * len(batch))
+        
+        failed = analysis_ids.count(None)
+        self.logger.info("Stored %s job analyses (%s failed)", len(rows) - failed, failed)
+        return analysis_ids
+    
     # APPLICATION OPERATIONS
     def upsert_application(self, user_id: str, job_posting_id: str, 
                           resume_id: Optional[str] = None, status: str = "applied",
@@ -266,41 +436,39 @@ class SupabaseRepo:
         """Create or update application. Returns application_id."""
         try:
             # Check for existing application
-            result = self.sb.table("applications").select("id").eq("user_id", user_id).eq("job_posting_id", job_posting_id).execute()
+            result = self._applications.select("id").eq("user_id", user_id).eq("job_posting_id", job_posting_id).execute()
             
             if result.data:
                 # Update existing application
                 app_id = result.data[0]["id"]
                 updates = {
                     "status": status,
-                    "feedback": feedback,
-                    "updated_at": datetime.now().isoformat()
+                    "feedback": feedback
                 }
-                self.sb.table("applications").update(updates).eq("id", app_id).execute()
-                self.logger.info(f"Updated application {app_id}: status={status}")
+                self._applications.update(updates, returning="minimal").eq("id", app_id).execute()
+                self.logger.info("Updated application %s: status=%s", app_id, status)
                 return app_id
             
-            # Create new application
+            # Create new application (submitted_at defaults to the database clock)
             app_data = {
                 "user_id": user_id,
                 "job_posting_id": job_posting_id,
                 "resume_id": resume_id,
                 "status": status,
-                "feedback": feedback,
-                "submitted_at": datetime.now().isoformat()
+                "feedback": feedback
             }
             
-            result = self.sb.table("applications").insert(app_data).execute()
+            result = self._applications.insert(app_data).execute()
             
             if result.data:
                 app_id = result.data[0]["id"]
-                self.logger.info(f"Created application {app_id}: status={status}")
+                self.logger.info("Created application %s: status=%s", app_id, status)
                 return app_id
             
             raise Exception("Failed to create application")
             
         except Exception as e:
-            self.logger.error(f"Error upserting application: {str(e)}")
+            self.logger.error("Error upserting application: %s", e)
             raise
     
     # HUMAN-IN-THE-LOOP OPERATIONS
@@ -328,7 +496,7 @@ class SupabaseRepo:
                 "estimated_application_priority": estimated_application_priority
             }
             
-            result = self.sb.table("role_analyses").insert(analysis_data).execute()
+            result = self._role_analyses.insert(analysis_data).execute()
             
             if result.data:
                 return result.data[0]["id"]
@@ -336,7 +504,7 @@ class SupabaseRepo:
             raise Exception("Failed to store role analysis")
             
         except Exception as e:
-            self.logger.error(f"Error storing role analysis: {str(e)}")
+            self.logger.error("Error storing role analysis: %s", e)
             raise
     
     def store_resume_optimization(self, role_analysis_id: str, master_resume_id: str,
@@ -361,7 +529,7 @@ class SupabaseRepo:
                 "human_review_notes": human_review_notes
             }
             
-            result = self.sb.table("resume_optimizations").insert(optimization_data).execute()
+            result = self._resume_optimizations.insert(optimization_data).execute()
             
             if result.data:
                 return result.data[0]["id"]
@@ -369,33 +537,41 @@ class SupabaseRepo:
             raise Exception("Failed to store resume optimization")
             
         except Exception as e:
-            self.logger.error(f"Error storing resume optimization: {str(e)}")
+            self.logger.error("Error storing resume optimization: %s", e)
             raise
     
     def store_resume_delta(self, resume_optimization_id: str, master_bullet_id: str,
                           operation: str, from_text: str, to_text: Optional[str],
                           concept_ids: List[str], notes: str) -> str:
         """Store individual resume delta. Returns resume_delta_id."""
+        delta_ids = self.store_resume_deltas(resume_optimization_id, [{
+            "master_bullet_id": master_bullet_id,
+            "operation": operation,
+            "from_text": from_text,
+            "to_text": to_text,
+            "concept_ids": concept_ids,
+            "notes": notes
+        }])
+        return delta_ids[0]
+    
+    def store_resume_deltas(self, resume_optimization_id: str, deltas: List[Dict[str, Any]]) -> List[str]:
+        """Store all deltas of a resume optimization in one insert. Returns resume_delta_ids in input order."""
+        if not deltas:
+            return []
+        
         try:
-            delta_data = {
-                "resume_optimization_id": resume_optimization_id,
-                "master_bullet_id": master_bullet_id,
-                "operation": operation,
-                "from_text": from_text,
-                "to_text": to_text,
-                "concept_ids": concept_ids,
-                "notes": notes
-            }
+            delta_rows = resume_delta_rows(resume_optimization_id, deltas)
             
-            result = self.sb.table("resume_deltas").insert(delta_data).execute()
+            # Single statement, so either every delta is stored or none are
+            result = self._resume_deltas.insert(delta_rows).execute()
             
-            if result.data:
-                return result.data[0]["id"]
+            if result.data and len(result.data) == len(delta_rows):
+                return [row["id"] for row in result.data]
             
-            raise Exception("Failed to store resume delta")
+            raise Exception("Failed to store resume deltas")
             
         except Exception as e:
-            self.logger.error(f"Error storing resume delta: {str(e)}")
+            self.logger.error("Error storing %s resume deltas: %s", len(deltas), e)
             raise
     
     def store_translation_event(self, application_id: Optional[str], role_analysis_id: str,
@@ -414,27 +590,45 @@ class SupabaseRepo:
                 "translated_terms": translated_terms,
                 "claude_api_used": claude_api_used,
                 "api_cost": api_cost,
-                "processing_time_ms": processing_time_ms
+                "processing_time_ms": processing_time_ms,
+                "mapping_ids": mapping_ids
             }
             
-            result = self.sb.table("translation_events").insert(event_data).execute()
+            # Event insert and mapping links go out as one statement (no mapping upserts here)
+            result = self.sb.rpc("store_translation_event_with_mappings", {
+                "p_event": event_data,
+                "p_mappings": []
+            }).execute()
             
             if result.data:
-                event_id = result.data[0]["id"]
-                
-                # Create mapping relationships
-                for mapping_id in mapping_ids:
-                    self.sb.table("translation_event_mappings").insert({
-                        "translation_event_id": event_id,
-                        "concept_mapping_id": mapping_id
-                    }).execute()
-                
-                return event_id
+                return result.data
             
             raise Exception("Failed to store translation event")
             
         except Exception as e:
-            self.logger.error(f"Error storing translation event: {str(e)}")
+            self.logger.error("Error storing translation event: %s", e)
+            raise
+    
+    def store_translation_event_with_mappings(self, event: Dict[str, Any],
+                                              mappings: List[Dict[str, Any]]) -> str:
+        """
+        Upsert concept mappings and store translation event in one round trip.
+        Returns translation_event_id.
+        """
+        try:
+            # Single server-side statement: mapping upserts + event insert + mapping links
+            result = self.sb.rpc("store_translation_event_with_mappings", {
+                "p_event": event,
+                "p_mappings": mappings
+            }).execute()
+            
+            if result.data:
+                return result.data
+            
+            raise Exception("Failed to store translation event")
+            
+        except Exception as e:
+            self.logger.error("Error storing translation event with mappings: %s", e)
             raise
     
     def upsert_concept_mapping(self, raw_term: str, concept_id: str,
@@ -442,8 +636,8 @@ class SupabaseRepo:
                               successful_match_count: int, user_id: str) -> str:
         """Upsert concept mapping. Returns concept_mapping_id."""
         try:
-            # Try to find existing mapping
-            query = self.sb.table("concept_mappings").select("id").eq("raw_term", raw_term.lower()).eq("concept_id", concept_id)
+            # Try to find existing mapping (raw_term_lc is lower(raw_term), generated by the database)
+            query = self._concept_mappings.select("id").eq("raw_term_lc", raw_term.lower()).eq("concept_id", concept_id)
             if company_id:
                 query = query.eq("company_id", company_id)
             else:
@@ -454,15 +648,15 @@ class SupabaseRepo:
             if result.data:
                 # Update existing
                 mapping_id = result.data[0]["id"]
-                self.sb.table("concept_mappings").update({
+                self._concept_mappings.update({
                     "confidence_score": confidence_score,
                     "successful_match_count": successful_match_count
-                }).eq("id", mapping_id).execute()
+                }, returning="minimal").eq("id", mapping_id).execute()
                 return mapping_id
             else:
                 # Create new
                 mapping_data = {
-                    "raw_term": raw_term.lower(),
+                    "raw_term": raw_term,
                     "concept_id": concept_id,
                     "company_id": company_id,
                     "confidence_score": confidence_score,
@@ -470,23 +664,23 @@ class SupabaseRepo:
                     "user_id": user_id
                 }
                 
-                result = self.sb.table("concept_mappings").insert(mapping_data).execute()
+                result = self._concept_mappings.insert(mapping_data).execute()
                 if result.data:
                     return result.data[0]["id"]
             
             raise Exception("Failed to upsert concept mapping")
             
         except Exception as e:
-            self.logger.error(f"Error upserting concept mapping: {str(e)}")
+            self.logger.error("Error upserting concept mapping: %s", e)
             raise
     
-    def get_master_bullet(self, bullet_id: str) -> Optional[Dict[str, Any]]:
-        """Get master bullet by ID."""
+    def get_master_bullet(self, bullet_id: str, fields: str = "*") -> Optional[Dict[str, Any]]:
+        """Get master bullet by ID. Pass fields to fetch only the columns the caller needs."""
         try:
-            result = self.sb.table("master_bullets").select("*").eq("id", bullet_id).execute()
+            result = self._master_bullets.select(fields).eq("id", bullet_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
-            self.logger.error(f"Error getting master bullet {bullet_id}: {str(e)}")
+            self.logger.error("Error getting master bullet %s: %s", bullet_id, e)
             return None
 
     # LEARNING/TRANSLATION OPERATIONS
@@ -494,88 +688,56 @@ class SupabaseRepo:
                                 event_type: str = "success") -> str:
         """Record a translation learning event. Returns event_id."""
         try:
-            event_data = {
-                "concept_mapping_id": concept_mapping_id,
-                "application_id": application_id,
-                "event_type": event_type
-            }
-            
-            result = self.sb.table("translation_events").insert(event_data).execute()
+            # Event insert and success counter bump run as one server-side transaction
+            result = self.sb.rpc("record_translation_event", {
+                "p_concept_mapping_id": concept_mapping_id,
+                "p_application_id": application_id,
+                "p_event_type": event_type
+            }).execute()
             
             if result.data:
-                event_id = result.data[0]["id"]
-                
-                # Increment successful_match_count for the concept mapping
-                if event_type == "success":
-                    self.sb.table("concept_mappings").rpc(
-                        "increment_match_count",
-                        {"mapping_id": concept_mapping_id}
-                    ).execute()
-                
-                self.logger.info(f"Recorded translation event: {event_type}")
-                return event_id
+                self.logger.info("Recorded translation event: %s", event_type)
+                return result.data
             
             raise Exception("Failed to record translation event")
             
         except Exception as e:
-            self.logger.error(f"Error recording translation event: {str(e)}")
+            self.logger.error("Error recording translation event: %s", e)
             raise
     
     def increment_concept_mapping_success(self, concept_mapping_id: str) -> bool:
         """Increment successful match count for a concept mapping."""
         try:
-            # Get current count
-            result = self.sb.table("concept_mappings").select("successful_match_count").eq("id", concept_mapping_id).execute()
+            result = self.sb.rpc("increment_match_count", {"mapping_id": concept_mapping_id}).execute()
             
-            if not result.data:
+            if result.data is None:
+                self.logger.warning("Concept mapping %s not found; match count not incremented", concept_mapping_id)
                 return False
             
-            current_count = result.data[0].get("successful_match_count", 0)
-            new_count = (current_count or 0) + 1
-            
-            # Update count
-            self.sb.table("concept_mappings").update({"successful_match_count": new_count}).eq("id", concept_mapping_id).execute()
-            
-            self.logger.info(f"Incremented concept mapping success count to {new_count}")
+            self.logger.info("Incremented concept mapping success count for %s to %s", concept_mapping_id, result.data)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error incrementing concept mapping success: {str(e)}")
+            self.logger.error("Error incrementing concept mapping success: %s", e)
             return False
     
     # ANALYTICS OPERATIONS
     def get_database_stats(self) -> Dict[str, Any]:
         """Get comprehensive database statistics."""
         try:
-            stats = {}
-            
-            # Count records in each table
-            tables = ["users", "companies", "concepts", "job_postings", "applications", "concept_mappings", "translation_events"]
-            
-            for table in tables:
-                try:
-                    result = self.sb.table(table).select("*", count="exact").execute()
-                    stats[f"{table}_count"] = result.count if hasattr(result, 'count') else len(result.data)
-                except Exception as e:
-                    stats[f"{table}_count"] = f"Error: {str(e)}"
-            
-            # Additional analytics
-            try:
-                # Average fit scores
-                result = self.sb.table("role_analysis").select("fit_score").execute()
-                if result.data:
-                    scores = [r.get("fit_score", 0) for r in result.data if r.get("fit_score") is not None]
-                    stats["avg_fit_score"] = sum(scores) / len(scores) if scores else 0
-                
-                # Top concepts by usage
-                result = self.sb.table("concept_mappings").select("concept_id, successful_match_count").order("successful_match_count", desc=True).limit(5).execute()
-                stats["top_concepts"] = result.data
-                
-            except Exception as e:
-                stats["analytics_error"] = str(e)
-            
-            return stats
+            result = self.sb.rpc("database_stats").execute()
+            return result.data or {}
             
         except Exception as e:
-            self.logger.error(f"Error getting database stats: {str(e)}")
-            return {"error": str(e)}
\ No newline at end of file
+            self.logger.error("Error getting database stats: %s", e)
+            return {"error": str(e)}
+    
+    def refresh_role_analysis_stats(self) -> bool:
+        """Refresh the materialized fit score aggregate read by get_database_stats."""
+        try:
+            self.sb.rpc("refresh_role_analysis_stats").execute()
+            self.logger.info("Refreshed role analysis stats")
+            return True
+        except Exception as e:
+            self.logger.error("Error refreshing role analysis stats: %s", e)
+            return False
\ No newline at end of file
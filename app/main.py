@@ -9,6 +9,9 @@ from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 import logging
+import re
+
+from app.api.responses import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,7 +20,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="SmartApply Architecture Demo",
     description="Portfolio showcase of human-in-the-loop job analysis system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -63,7 +67,7 @@ class ResumeOptimization(BaseModel):
     """Resume optimization validation model."""
     role_analysis_id: str = Field(..., description="UUID from role analysis")
     master_resume_id: str = Field(..., description="UUID of master resume")
-    optimization_deltas: Dict[str, Any] = Field(default_factory=dict, description="High-level changes")
+    optimization_deltas: dict = Field(default_factory=dict, description="High-level changes")
     optimization_reasoning: str = Field(..., description="Why these optimizations were made")
     optimized_resume_text: str = Field(..., description="Full optimized resume text")
     optimized_file_url: Optional[str] = Field(None, description="URL to optimized file")
@@ -91,10 +95,17 @@ class TranslationEvent(BaseModel):
 
 # Validation Functions
 
+_ALLOWED_OPERATIONS = frozenset(('rephrase', 'reorder', 'emphasize', 'omit'))
+_WORD_PATTERN = re.compile(r'\S+')
+
+
+def _word_count(text: str) -> int:
+    """Count whitespace-separated words without building the list str.split() would."""
+    return sum(1 for _ in _WORD_PATTERN.finditer(text))
+
+
 def validate_resume_deltas(deltas: List[ResumeDelta]) -> Dict[str, Any]:
     """Validate resume deltas against business rules."""
-    allowed_operations = {'rephrase', 'reorder', 'emphasize', 'omit'}
-    
     validation_results = {
         "valid": True,
         "errors": [],
@@ -103,15 +114,15 @@ def validate_resume_deltas(deltas: List[ResumeDelta]) -> Dict[str, Any]:
     
     for i, delta in enumerate(deltas):
         # Check operation is allowed
-        if delta.operation not in allowed_operations:
+        if delta.operation not in _ALLOWED_OPERATIONS:
             validation_results["valid"] = False
             validation_results["errors"].append(
-                f"Delta {i}: Invalid operation '{delta.operation}'. Must be one of: {allowed_operations}"
+                f"Delta {i}: Invalid operation '{delta.operation}'. Must be one of: {sorted(_ALLOWED_OPERATIONS)}"
             )
         
         # Check for potential fabrication (demo logic)
         if delta.operation == "rephrase" and delta.to_text:
-            if len(delta.to_text.split()) > len(delta.from_text.split()) * 1.5:
+            if _word_count(delta.to_text) > _word_count(delta.from_text) * 1.5:
                 validation_results["warnings"].append(
                     f"Delta {i}: Significant text expansion detected - review for fabrication"
                 )
@@ -153,7 +164,7 @@ def validate_role_analysis(ra: RoleAnalysis):
     
     return {
         "ok": True,
-        "received": ra,
+        "job_posting_id": ra.job_posting_id,
         "validation": validation_results,
         "demo_note": "In production, this would store to Supabase with full audit trail"
     }
@@ -172,7 +183,8 @@ def validate_resume_optimization(ro: ResumeOptimization):
     
     return {
         "ok": True,
-        "received": ro,
+        "role_analysis_id": ro.role_analysis_id,
+        "delta_count": len(ro.resume_deltas),
         "delta_validation": delta_validation,
         "demo_note": "In production, this would enforce master_bullet FK constraints"
     }
@@ -191,7 +203,7 @@ def validate_translation_event(te: TranslationEvent):
     
     return {
         "ok": True,
-        "received": te,
+        "role_analysis_id": te.role_analysis_id,
         "validation": validation_results,
         "demo_note": "In production, this would update concept mapping success rates"
     }
@@ -2,29 +2,63 @@
 Main FastAPI application for SmartApply Human-in-the-Loop.
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timezone
+import atexit
 import logging
+import os
+import queue
+import time
 
 from app.api.human_endpoints import router as human_router
+from app.api.responses import ORJSONResponse
+from app.db.async_supabase_repo import AsyncSupabaseRepo
 
-# Configure logging
+# Configure logging; the file and stream writes happen on a listener thread, not the event loop
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler('smartapply_api.log'), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('smartapply_api.log'),
-        logging.StreamHandler()
-    ]
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[_queue_handler]
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one async Supabase client for the app's lifetime and close it on shutdown."""
+    try:
+        app.state.repo = await AsyncSupabaseRepo.create()
+    except Exception as e:
+        # Requests will fail with 500/503 until credentials are fixed, but the app still starts
+        logger.error("Failed to initialize Supabase repo: %s", e)
+        app.state.repo = None
+    
+    yield
+    
+    if app.state.repo is not None:
+        await app.state.repo.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="SmartApply API",
     description="Human-in-the-Loop job application system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -36,6 +70,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized payloads before routing and body parsing
+MAX_REQUEST_BODY_BYTES = 2_000_000
+
+@app.middleware("http")
+async def limit_request_body_size(request: Request, call_next):
+    """Return 413 for requests whose declared Content-Length exceeds the cap."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_BODY_BYTES:
+        return ORJSONResponse(status_code=413, content={"detail": "Request body too large"})
+    return await call_next(request)
+
 # Include routers
 app.include_router(human_router)
 
@@ -52,22 +97,34 @@ async def root():
         }
     }
 
+# Load balancer probes within this window reuse the last database ping instead of hitting the pool
+HEALTH_CACHE_SECONDS = 5.0
+_health_cache = {"ok": False, "checked_at": None, "monotonic": float("-inf")}
+
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Detailed health check."""
     try:
-        from app.db.supabase_repo import SupabaseRepo
+        # The repository is created once in the app lifespan
+        repo = getattr(request.app.state, "repo", None)
+        if repo is None:
+            raise RuntimeError("Supabase repo is not initialized")
+        
+        if time.monotonic() - _health_cache["monotonic"] >= HEALTH_CACHE_SECONDS:
+            _health_cache["ok"] = await repo.ping()
+            _health_cache["checked_at"] = datetime.now(timezone.utc).isoformat()
+            _health_cache["monotonic"] = time.monotonic()
         
-        # Test database connection
-        repo = SupabaseRepo()
+        if not _health_cache["ok"]:
+            raise RuntimeError("Supabase ping failed")
         
         return {
             "status": "healthy",
             "database": "connected",
-            "timestamp": "2025-08-20T01:30:00Z"
+            "timestamp": _health_cache["checked_at"]
         }
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
 if __name__ == "__main__":
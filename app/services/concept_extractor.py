@@ -6,13 +6,52 @@ Extracts concepts from text using learned mappings and confidence scores.
 import re
 import logging
 import html
+import time
+import hashlib
+from collections import defaultdict
+from operator import itemgetter
 from typing import List, Set, Optional
 from supabase import Client
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _is_word_char(char: str) -> bool:
+    """Same notion of a word character as re's \\w on str patterns."""
+    return char.isalnum() or char == "_"
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """True where re's \\b would match, i.e. between a word and a non-word character."""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+def _contains_term(text: str, term: str) -> bool:
+    """str.find scan for term with a word boundary on both sides, equivalent to re.search(rf"\\b{term}\\b")."""
+    end_offset = len(term)
+    pos = text.find(term)
+    while pos != -1:
+        if _is_word_boundary(text, pos) and _is_word_boundary(text, pos + end_offset):
+            return True
+        pos = text.find(term, pos + 1)
+    return False
+
 
 class ConceptExtractor:
     """Extracts concepts from job descriptions using learned mappings."""
     
+    # Rows per request when loading mappings; matches PostgREST's default max-rows cap
+    MAPPING_PAGE_SIZE = 1000
+    # Upper bound on memoized extract() results (reposted jobs share descriptions)
+    EXTRACT_CACHE_MAX_ENTRIES = 10_000
+    # Memoized results older than this are recomputed even if the mappings haven't changed
+    EXTRACT_CACHE_TTL_SECONDS = 24 * 60 * 60
+    
     def __init__(self, sb: Client):
         """Initialize concept extractor with Supabase client."""
         self.sb = sb
@@ -20,42 +59,166 @@ class ConceptExtractor:
         
         # Cache for concept mappings to avoid repeated queries
         self._mapping_cache = {}
+        # (raw_term, compiled word-boundary pattern or None for ASCII terms, best mapping) per term
+        self._term_matchers = []
+        # raw_term -> its index in _term_matchers (and the automaton payloads)
+        self._term_indexes = {}
+        # Indexes into _term_matchers whose best mapping clears the extraction threshold
+        self._high_conf_indexes = set()
+        # Aho-Corasick automaton over all terms (one pass per text) when pyahocorasick is installed
+        self._automaton = None
         self._cache_valid = False
+        # Bumped on every refresh or in-place update so callers can detect mapping changes
+        self._cache_version = 0
+        # Description digest -> (monotonic time computed, extracted concepts), valid for _extract_cache_version only
+        self._extract_cache = {}
+        self._extract_cache_version = None
+    
+    @staticmethod
+    def _build_term_matcher(raw_term: str, mappings: list) -> tuple:
+        """(raw_term, pattern or None, best mapping) entry for _term_matchers."""
+        # Terms are already lowercase and matched against lowercased text, so no IGNORECASE.
+        # ASCII terms are scanned with str.find; only the rest need a compiled pattern.
+        return (
+            raw_term,
+            None if raw_term.isascii() else re.compile(rf"\b{re.escape(raw_term)}\b"),
+            max(mappings, key=itemgetter("confidence"))
+        )
     
     def _refresh_mapping_cache(self):
         """Refresh the concept mapping cache."""
         try:
-            # Get all concept mappings with concept names
-            result = self.sb.table("concept_mappings").select(
-                "raw_term, concept_id, confidence_score, concepts(name)"
-            ).execute()
+            # Get all concept mappings with concept names (joined in the concept_mappings_flat view),
+            # a page at a time so the server's row cap can't silently truncate the cache
+            rows = []
+            while True:
+                page = self.sb.table("concept_mappings_flat").select(
+                    "id, raw_term, confidence_score, concept_name"
+                ).order("id").range(len(rows), len(rows) + self.MAPPING_PAGE_SIZE - 1).execute().data
+                rows.extend(page)
+                if len(page) < self.MAPPING_PAGE_SIZE:
+                    break
             
-            self._mapping_cache = {}
+            mapping_cache = defaultdict(list)
             
-            for mapping in result.data:
-                raw_term = mapping.get("raw_term", "").strip().lower()
-                confidence = mapping.get("confidence_score", 0)
-                concept_data = mapping.get("concepts")
-                
-                if raw_term and concept_data and isinstance(concept_data, dict):
-                    concept_name = concept_data.get("name")
-                    if concept_name:
-                        if raw_term not in self._mapping_cache:
-                            self._mapping_cache[raw_term] = []
-                        
-                        self._mapping_cache[raw_term].append({
-                            "concept_name": concept_name,
-                            "confidence": confidence,
-                            "mapping_id": mapping.get("id")
-                        })
+            for mapping in rows:
+                raw_term = mapping["raw_term"].strip().lower()
+                if raw_term:
+                    mapping_cache[raw_term].append({
+                        "concept_name": mapping["concept_name"],
+                        "confidence": mapping["confidence_score"],
+                        "mapping_id": mapping["id"]
+                    })
+            
+            # Plain dict so later lookups of unknown terms don't insert empty entries
+            self._mapping_cache = dict(mapping_cache)
+            
+            self._term_matchers = [
+                self._build_term_matcher(raw_term, mappings)
+                for raw_term, mappings in self._mapping_cache.items()
+            ]
+            self._term_indexes = {raw_term: index for index, (raw_term, _, _) in enumerate(self._term_matchers)}
+            self._high_conf_indexes = {
+                index for index, (_, _, best_mapping) in enumerate(self._term_matchers)
+                if best_mapping["confidence"] >= 0.7
+            }
+            
+            self._automaton = None
+            if ahocorasick is not None and self._term_matchers:
+                self._automaton = ahocorasick.Automaton()
+                for index, (raw_term, _, _) in enumerate(self._term_matchers):
+                    self._automaton.add_word(raw_term, (index, len(raw_term)))
+                self._automaton.make_automaton()
             
             self._cache_valid = True
+            self._cache_version += 1
             self.logger.info(f"Refreshed concept mapping cache with {len(self._mapping_cache)} terms")
             
         except Exception as e:
             self.logger.error(f"Error refreshing mapping cache: {str(e)}")
             self._cache_valid = False
     
+    def _add_to_mapping_cache(self, raw_term: str, concept_name: str, confidence: float, mapping_id: str):
+        """Apply one new mapping to the loaded cache in place instead of reloading every mapping."""
+        mappings = self._mapping_cache.setdefault(raw_term, [])
+        # The mapping RPC returns an existing term -> concept mapping unchanged
+        if any(mapping["concept_name"] == concept_name for mapping in mappings):
+            return
+        
+        new_mapping = {
+            "concept_name": concept_name,
+            "confidence": confidence,
+            "mapping_id": mapping_id
+        }
+        mappings.append(new_mapping)
+        
+        index = self._term_indexes.get(raw_term)
+        if index is None:
+            matcher = self._build_term_matcher(raw_term, mappings)
+            index = len(self._term_matchers)
+            self._term_matchers.append(matcher)
+            self._term_indexes[raw_term] = index
+            if ahocorasick is not None:
+                if self._automaton is None:
+                    self._automaton = ahocorasick.Automaton()
+                self._automaton.add_word(raw_term, (index, len(raw_term)))
+                self._automaton.make_automaton()
+        else:
+            # Only the new mapping can displace the current best; the term's pattern is unchanged
+            matcher = self._term_matchers[index]
+            if confidence > matcher[2]["confidence"]:
+                matcher = (matcher[0], matcher[1], new_mapping)
+                self._term_matchers[index] = matcher
+        
+        if matcher[2]["confidence"] >= 0.7:
+            self._high_conf_indexes.add(index)
+        else:
+            self._high_conf_indexes.discard(index)
+        
+        self._cache_version += 1
+    
+    def _match_terms(self, normalized_text: str, high_confidence_only: bool = False,
+                     distinct_concepts: bool = False) -> list:
+        """
+        Return the _term_matchers entries whose term occurs in the text on word boundaries.
+        
+        With distinct_concepts, a high confidence term is not checked once another high
+        confidence term has matched the same concept, since it cannot add anything new.
+        """
+        candidates = self._high_conf_indexes if high_confidence_only else None
+        found_concepts = set()
+        
+        def wanted(index: int) -> bool:
+            if candidates is not None and index not in candidates:
+                return False
+            return not (distinct_concepts and index in self._high_conf_indexes
+                        and self._term_matchers[index][2]["concept_name"] in found_concepts)
+        
+        def record(index: int):
+            if distinct_concepts and index in self._high_conf_indexes:
+                found_concepts.add(self._term_matchers[index][2]["concept_name"])
+        
+        if self._automaton is None:
+            matched = []
+            for index, matcher in enumerate(self._term_matchers):
+                if not wanted(index):
+                    continue
+                raw_term, pattern, _ = matcher
+                if _contains_term(normalized_text, raw_term) if pattern is None else pattern.search(normalized_text):
+                    matched.append(matcher)
+                    record(index)
+            return matched
+        
+        # One automaton pass finds every occurrence; keep terms with at least one \b-delimited hit
+        matched = set()
+        for end, (index, length) in self._automaton.iter(normalized_text):
+            if index in matched or not wanted(index):
+                continue
+            if _is_word_boundary(normalized_text, end - length + 1) and _is_word_boundary(normalized_text, end + 1):
+                matched.add(index)
+                record(index)
+        return [self._term_matchers[index] for index in sorted(matched)]
+    
     def _normalize_text(self, text: str) -> str:
         """
         Normalize text for better concept extraction.
@@ -118,9 +281,6 @@ class ConceptExtractor:
                     jd_text += " " + str(text[field])
             text = jd_text
         
-        # Normalize text for better matching
-        normalized_text = self._normalize_text(text)
-        
         # Refresh cache if needed
         if not self._cache_valid:
             self._refresh_mapping_cache()
@@ -129,33 +289,51 @@ class ConceptExtractor:
             self.logger.warning("No concept mappings available")
             return []
         
+        # Memoized results are only good for the mappings they were computed with
+        if self._extract_cache_version != self._cache_version:
+            self._extract_cache = {}
+            self._extract_cache_version = self._cache_version
+        
+        # Keyed by digest so the cache doesn't hold on to full descriptions
+        cache_key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        now = time.monotonic()
+        cached = self._extract_cache.pop(cache_key, None)
+        if cached is not None and now - cached[0] < self.EXTRACT_CACHE_TTL_SECONDS:
+            # Re-insert to keep recently used entries at the end of the eviction order
+            self._extract_cache[cache_key] = cached
+            self.logger.info(f"Extracted {len(cached[1])} concepts from text (cached)")
+            return list(cached[1])
+        
+        # Normalize text for better matching
+        normalized_text = self._normalize_text(text)
+        
         extracted_concepts: Set[str] = set()
         low_confidence_terms: Set[str] = set()
         
         # Use the new normalization method for better matching
         # (Note: normalized_text was already set above after field extraction)
         
+        # Low confidence terms are only collected for logging, so skip them when INFO is off
+        high_confidence_only = not self.logger.isEnabledFor(logging.INFO)
+        
         # Match against cached mappings
-        for raw_term, mappings in self._mapping_cache.items():
-            # Use word boundary regex for better matching
-            pattern = rf"\b{re.escape(raw_term)}\b"
-            
-            if re.search(pattern, normalized_text, flags=re.IGNORECASE):
-                # Get the best mapping for this term
-                best_mapping = max(mappings, key=lambda m: m["confidence"])
-                
-                if best_mapping["confidence"] >= 0.7:
-                    extracted_concepts.add(best_mapping["concept_name"])
-                    self.logger.debug(f"High confidence match: '{raw_term}' -> '{best_mapping['concept_name']}'")
-                else:
-                    low_confidence_terms.add(raw_term)
-                    self.logger.debug(f"Low confidence match: '{raw_term}' (confidence: {best_mapping['confidence']})")
+        for raw_term, _, best_mapping in self._match_terms(normalized_text, high_confidence_only, distinct_concepts=True):
+            if best_mapping["confidence"] >= 0.7:
+                extracted_concepts.add(best_mapping["concept_name"])
+                self.logger.debug(f"High confidence match: '{raw_term}' -> '{best_mapping['concept_name']}'")
+            else:
+                low_confidence_terms.add(raw_term)
+                self.logger.debug(f"Low confidence match: '{raw_term}' (confidence: {best_mapping['confidence']})")
         
         # Log low confidence terms for potential review
         if low_confidence_terms:
             self.logger.info(f"Found {len(low_confidence_terms)} low confidence terms: {list(low_confidence_terms)[:5]}")
         
         result = list(extracted_concepts)
+        self._extract_cache[cache_key] = (now, tuple(result))
+        while len(self._extract_cache) > self.EXTRACT_CACHE_MAX_ENTRIES:
+            del self._extract_cache[next(iter(self._extract_cache))]
+        
         self.logger.info(f"Extracted {len(result)} concepts from text")
         return result
     
@@ -178,18 +356,13 @@ class ConceptExtractor:
         results = []
         normalized_text = text.lower()
         
-        for raw_term, mappings in self._mapping_cache.items():
-            pattern = rf"\b{re.escape(raw_term)}\b"
-            
-            if re.search(pattern, normalized_text, flags=re.IGNORECASE):
-                best_mapping = max(mappings, key=lambda m: m["confidence"])
-                
-                results.append({
-                    "concept": best_mapping["concept_name"],
-                    "confidence": best_mapping["confidence"],
-                    "raw_term": raw_term,
-                    "mapping_id": best_mapping["mapping_id"]
-                })
+        for raw_term, _, best_mapping in self._match_terms(normalized_text):
+            results.append({
+                "concept": best_mapping["concept_name"],
+                "confidence": best_mapping["confidence"],
+                "raw_term": raw_term,
+                "mapping_id": best_mapping["mapping_id"]
+            })
         
         # Sort by confidence descending
         results.sort(key=lambda x: x["confidence"], reverse=True)
@@ -209,34 +382,21 @@ class ConceptExtractor:
             True if successful
         """
         try:
-            # Get or create the concept
-            concept_result = self.sb.table("concepts").select("id").eq("name", concept_name).execute()
-            
-            if concept_result.data:
-                concept_id = concept_result.data[0]["id"]
-            else:
-                # Create new concept
-                create_result = self.sb.table("concepts").insert({"name": concept_name}).execute()
-                if not create_result.data:
-                    self.logger.error(f"Failed to create concept: {concept_name}")
-                    return False
-                concept_id = create_result.data[0]["id"]
-            
-            # Create mapping
-            mapping_data = {
-                "raw_term": raw_term.lower().strip(),
-                "concept_id": concept_id,
-                "confidence_score": confidence_score
-            }
-            
-            result = self.sb.table("concept_mappings").insert(mapping_data).execute()
+            # Concept and mapping are resolved server-side in one round trip
+            result = self.sb.rpc("get_or_create_concept_mapping", {
+                "p_raw_term": raw_term.lower().strip(),
+                "p_concept_name": concept_name,
+                "p_confidence_score": confidence_score
+            }).execute()
             
             if result.data:
                 self.logger.info(f"Added manual mapping: '{raw_term}' -> '{concept_name}' (confidence: {confidence_score})")
-                # Invalidate cache to force refresh
-                self._cache_valid = False
+                # Update a loaded cache in place; an unloaded one picks the mapping up on first refresh
+                if self._cache_valid:
+                    self._add_to_mapping_cache(raw_term.lower().strip(), concept_name, confidence_score, result.data)
                 return True
             
+            self.logger.error(f"Failed to add manual mapping: '{raw_term}' -> '{concept_name}'")
             return False
             
         except Exception as e:
@@ -249,18 +409,23 @@ class ConceptExtractor:
             if not self._cache_valid:
                 self._refresh_mapping_cache()
             
-            total_mappings = sum(len(mappings) for mappings in self._mapping_cache.values())
             unique_terms = len(self._mapping_cache)
             
-            # Calculate confidence distribution
-            all_confidences = []
+            # Calculate confidence distribution in a single pass
+            total_mappings = 0
+            confidence_sum = 0
+            high_confidence = medium_confidence = low_confidence = 0
             for mappings in self._mapping_cache.values():
                 for mapping in mappings:
-                    all_confidences.append(mapping["confidence"])
-            
-            high_confidence = len([c for c in all_confidences if c >= 0.7])
-            medium_confidence = len([c for c in all_confidences if 0.3 <= c < 0.7])
-            low_confidence = len([c for c in all_confidences if c < 0.3])
+                    confidence = mapping["confidence"]
+                    total_mappings += 1
+                    confidence_sum += confidence
+                    if confidence >= 0.7:
+                        high_confidence += 1
+                    elif confidence >= 0.3:
+                        medium_confidence += 1
+                    else:
+                        low_confidence += 1
             
             return {
                 "total_mappings": total_mappings,
@@ -268,7 +433,7 @@ class ConceptExtractor:
                 "high_confidence": high_confidence,
                 "medium_confidence": medium_confidence,
                 "low_confidence": low_confidence,
-                "avg_confidence": sum(all_confidences) / len(all_confidences) if all_confidences else 0
+                "avg_confidence": confidence_sum / total_mappings if total_mappings else 0
             }
             
         except Exception as e:
@@ -3,15 +3,19 @@ Observability Service - Production-Ready Logging and Metrics
 Portfolio showcase of comprehensive system observability.
 """
 
+import io
 import logging
+import re
 import time
-import json
+from collections import deque
 from contextlib import contextmanager
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+from typing import Dict, Any, IO, Optional
+from datetime import datetime
+from dataclasses import dataclass, field
 from enum import Enum
 
+import orjson
+
 
 class MetricType(Enum):
     COUNTER = "counter"
@@ -20,7 +24,7 @@ class MetricType(Enum):
     TIMER = "timer"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class APICallMetric:
     service: str
     endpoint: str
@@ -29,14 +33,12 @@ class APICallMetric:
     response_time_ms: int
     cost: float = 0.0
     user_id: Optional[str] = None
-    timestamp: datetime = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
+    # Monotonic recording time, used for recency windows instead of the wall-clock timestamp
+    mono_ns: int = field(default_factory=time.monotonic_ns)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IngestRunMetric:
     source: str
     run_type: str
@@ -45,11 +47,75 @@ class IngestRunMetric:
     jobs_matched: int = 0
     error_count: int = 0
     execution_time_ms: int = 0
-    timestamp: datetime = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+# Most recent API calls / ingest runs kept in memory; older entries are evicted as new ones arrive
+MAX_TRACKED_EVENTS = 50_000
+# Window get_health_metrics treats as "recent"
+HEALTH_WINDOW_NS = 5 * 60 * 1_000_000_000
+# Recent samples kept per histogram for percentiles (count/sum/avg cover every sample)
+HISTOGRAM_MAX_SAMPLES = 4096
+
+
+def _format_metric_key(metric_key) -> str:
+    """Render a name or (name, frozenset of label items) key as "name:k1=v1:k2=v2"."""
+    name, label_items = metric_key if isinstance(metric_key, tuple) else (metric_key, ())
+    return f"{name}:{':'.join(f'{k}={v}' for k, v in sorted(label_items))}"
+
+
+_PROMETHEUS_INVALID_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _prometheus_name(metric_key) -> str:
+    name = metric_key[0] if isinstance(metric_key, tuple) else metric_key
+    return _PROMETHEUS_INVALID_CHARS.sub("_", name)
+
+
+def _prometheus_series(metric_key, suffix: str = "", extra_labels: tuple = ()) -> str:
+    """Render a metric key as a Prometheus series, e.g. 'api_calls_total{service="openai"}'."""
+    label_items = sorted(metric_key[1]) if isinstance(metric_key, tuple) else []
+    labels = ",".join(
+        '{}="{}"'.format(
+            _PROMETHEUS_INVALID_CHARS.sub("_", str(k)),
+            str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for k, v in [*label_items, *extra_labels]
+    )
+    series = _prometheus_name(metric_key) + suffix
+    return f"{series}{{{labels}}}" if labels else series
+
+
+class Histogram:
+    """Running count and sum plus a bounded window of recent samples for percentiles."""
+    
+    __slots__ = ("count", "total", "samples")
+    
+    def __init__(self, max_samples: int = HISTOGRAM_MAX_SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=max_samples)
     
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+    
+    def summary(self) -> Dict[str, float]:
+        """Lifetime count/sum/avg and nearest-rank p50/p99 over the recent samples."""
+        ordered = sorted(self.samples)
+        
+        def percentile(pct: int) -> float:
+            # Nearest rank is ceil(pct/100 * n); integer math avoids float error (0.99 * 100 > 99)
+            return ordered[max(1, -(-pct * len(ordered) // 100)) - 1] if ordered else 0
+        
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else 0,
+            "p50": percentile(50),
+            "p99": percentile(99)
+        }
 
 
 class ObservabilityService:
@@ -79,36 +145,37 @@ class ObservabilityService:
             "counters": {},
             "gauges": {},
             "histograms": {},
-            "api_calls": [],
-            "ingest_runs": []
+            "api_calls": deque(maxlen=MAX_TRACKED_EVENTS),
+            "ingest_runs": deque(maxlen=MAX_TRACKED_EVENTS)
         }
         
         self.logger.info(f"ObservabilityService initialized for {service_name}")
     
     def log_structured(self, level: str, message: str, **context):
         """Log with structured context data."""
+        if not self.logger.isEnabledFor(logging.getLevelName(level.upper())):
+            return
+        
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "service": self.service_name,
             "message": message,
             "context": context
         }
         
-        getattr(self.logger, level.lower())(json.dumps(log_entry))
+        getattr(self.logger, level.lower())(orjson.dumps(log_entry).decode())
     
     @contextmanager
     def timer(self, operation: str, **context):
         """Context manager for timing operations."""
-        start_time = time.time()
-        start_ms = int(start_time * 1000)
+        start_ns = time.monotonic_ns()
         
         self.log_structured("info", f"Starting {operation}", operation=operation, **context)
         
         try:
             yield
             
-            end_time = time.time()
-            duration_ms = int((end_time - start_time) * 1000)
+            duration_ms = (time.monotonic_ns() - start_ns) // 1_000_000
             
             self.record_metric("timer", f"{operation}_duration_ms", duration_ms)
             self.log_structured(
@@ -120,8 +187,7 @@ class ObservabilityService:
             )
             
         except Exception as e:
-            end_time = time.time()
-            duration_ms = int((end_time - start_time) * 1000)
+            duration_ms = (time.monotonic_ns() - start_ns) // 1_000_000
             
             self.record_metric("counter", f"{operation}_errors", 1)
             self.log_structured(
@@ -138,7 +204,8 @@ class ObservabilityService:
         """Record a metric value."""
         labels = labels or {}
         
-        metric_key = f"{name}:{':'.join(f'{k}={v}' for k, v in sorted(labels.items()))}"
+        # Hashable key; the "name:k=v" string is only built at export time
+        metric_key = (name, frozenset(labels.items())) if labels else name
         
         if metric_type == "counter":
             self.metrics["counters"][metric_key] = self.metrics["counters"].get(metric_key, 0) + value
@@ -146,16 +213,17 @@ class ObservabilityService:
             self.metrics["gauges"][metric_key] = value
         elif metric_type == "histogram" or metric_type == "timer":
             if metric_key not in self.metrics["histograms"]:
-                self.metrics["histograms"][metric_key] = []
-            self.metrics["histograms"][metric_key].append(value)
+                self.metrics["histograms"][metric_key] = Histogram()
+            self.metrics["histograms"][metric_key].add(value)
         
-        self.log_structured(
-            "debug",
-            f"Recorded {metric_type} metric",
-            metric_name=name,
-            value=value,
-            labels=labels
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.log_structured(
+                "debug",
+                f"Recorded {metric_type} metric",
+                metric_name=name,
+                value=value,
+                labels=labels
+            )
     
     def track_api_call(self, service: str, endpoint: str, method: str, 
                       status_code: int, response_time_ms: int, 
@@ -237,11 +305,13 @@ class ObservabilityService:
     
     def get_health_metrics(self) -> Dict[str, Any]:
         """Get system health metrics."""
-        # Calculate recent error rates
-        recent_api_calls = [
-            call for call in self.metrics["api_calls"]
-            if call.timestamp > datetime.now() - timedelta(minutes=5)
-        ]
+        # Calculate recent error rates; calls are appended in time order, so walk back from the newest
+        cutoff_ns = time.monotonic_ns() - HEALTH_WINDOW_NS
+        recent_api_calls = []
+        for call in reversed(self.metrics["api_calls"]):
+            if call.mono_ns <= cutoff_ns:
+                break
+            recent_api_calls.append(call)
         
         recent_errors = len([call for call in recent_api_calls if call.status_code >= 400])
         error_rate = recent_errors / max(len(recent_api_calls), 1)
@@ -266,21 +336,60 @@ class ObservabilityService:
             }
         }
     
-    def export_metrics(self, format: str = "json") -> str:
-        """Export metrics in specified format."""
+    def export_metrics(self, format: str = "json", out: Optional[IO[str]] = None) -> Optional[str]:
+        """
+        Export metrics in specified format.
+        
+        Prometheus text format is written line by line to out when given (returning None),
+        otherwise it is returned as a string.
+        """
+        if format == "prometheus":
+            if out is None:
+                buffer = io.StringIO()
+                self._write_prometheus(buffer)
+                return buffer.getvalue()
+            self._write_prometheus(out)
+            return None
+        
         if format == "json":
             # Convert dataclasses to dicts for JSON serialization
             exportable = {
                 "service": self.service_name,
-                "timestamp": datetime.now().isoformat(),
-                "counters": self.metrics["counters"],
-                "gauges": self.metrics["gauges"],
-                "histograms": {k: {"count": len(v), "sum": sum(v), "avg": sum(v)/len(v) if v else 0} 
-                              for k, v in self.metrics["histograms"].items()},
+                "timestamp": datetime.now(),
+                "counters": {_format_metric_key(k): v for k, v in self.metrics["counters"].items()},
+                "gauges": {_format_metric_key(k): v for k, v in self.metrics["gauges"].items()},
+                "histograms": {_format_metric_key(k): v.summary() for k, v in self.metrics["histograms"].items()},
                 "recent_api_calls": len(self.metrics["api_calls"]),
                 "recent_ingest_runs": len(self.metrics["ingest_runs"])
             }
-            return json.dumps(exportable, indent=2)
+            return orjson.dumps(exportable, option=orjson.OPT_INDENT_2).decode()
+        
+        return "Format not supported"
+    
+    def _write_prometheus(self, out: IO[str]):
+        """Write every metric family in Prometheus text exposition format."""
+        families = (
+            ("counter", self.metrics["counters"]),
+            ("gauge", self.metrics["gauges"]),
+            ("summary", self.metrics["histograms"])
+        )
         
-        # Add Prometheus format if needed
-        return "Format not supported"
\ No newline at end of file
+        for prometheus_type, metrics in families:
+            # Series of one family must be contiguous, so group keys by metric name
+            current_family = None
+            for metric_key in sorted(metrics, key=_prometheus_name):
+                family = _prometheus_name(metric_key)
+                if family != current_family:
+                    out.write(f"# TYPE {family} {prometheus_type}\n")
+                    current_family = family
+                
+                if prometheus_type != "summary":
+                    out.write(f"{_prometheus_series(metric_key)} {metrics[metric_key]}\n")
+                    continue
+                
+                # Histograms keep raw recent samples rather than fixed buckets, so export as a summary
+                summary = metrics[metric_key].summary()
+                out.write(f"{_prometheus_series(metric_key, extra_labels=(('quantile', '0.5'),))} {summary['p50']}\n")
+                out.write(f"{_prometheus_series(metric_key, extra_labels=(('quantile', '0.99'),))} {summary['p99']}\n")
+                out.write(f"{_prometheus_series(metric_key, '_sum')} {summary['sum']}\n")
+                out.write(f"{_prometheus_series(metric_key, '_count')} {summary['count']}\n")
\ No newline at end of file
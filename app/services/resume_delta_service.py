@@ -8,6 +8,9 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from supabase import Client
 
+# Sections (lowercased) where generate_deltas refuses to add new bullets
+_EXPERIENCE_SECTIONS = frozenset({"experience", "work experience", "professional experience"})
+
 
 class ResumeDeltaService:
     """Handles resume optimization through delta generation."""
@@ -17,14 +20,17 @@ class ResumeDeltaService:
         self.sb = sb
         self.logger = logging.getLogger(__name__)
     
-    def get_master_bullets(self, user_id: str, master_resume_id: str) -> List[Dict[str, Any]]:
-        """Get all master bullets for a resume."""
+    def get_master_bullets(self, user_id: str, master_resume_id: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """Get a resume's master bullets, highest priority first (at most limit rows)."""
         try:
-            result = self.sb.table("master_bullets").select("*").eq(
+            # Only the columns generate_deltas reads (plus the sort key)
+            result = self.sb.table("master_bullets").select(
+                "id, bullet_text, section_name, priority_score"
+            ).eq(
                 "user_id", user_id
             ).eq(
                 "master_resume_id", master_resume_id
-            ).order("priority_score", desc=True).execute()
+            ).order("priority_score", desc=True).limit(limit).execute()
             
             return result.data if result.data else []
             
@@ -81,7 +87,8 @@ class ResumeDeltaService:
         Blocks creation of new "experience" bullets.
         """
         try:
-            delta_ids = []
+            # Delta rows are collected here and written in a single insert at the end
+            pending_rows = []
             applied_terms = applied_terms or []
             
             # Create mapping of original bullets by ID or content
@@ -91,87 +98,87 @@ class ResumeDeltaService:
             # Track which original bullets were used
             used_original_ids = set()
             
+            # Tokenize each original once and index it by word; a pair with no shared word can never
+            # clear the similarity threshold, so only originals sharing a word are compared
+            original_items = list(original_map.items())
+            original_words = [frozenset(bullet.get("bullet_text", "").lower().split()) for _, bullet in original_items]
+            postings: Dict[str, List[int]] = {}
+            for position, words in enumerate(original_words):
+                for word in words:
+                    postings.setdefault(word, []).append(position)
+            
+            def find_original(opt_text: str) -> Optional[Dict[str, Any]]:
+                """First unused original (in original order) similar to opt_text, marked as used."""
+                opt_words = frozenset(opt_text.lower().split())
+                candidates = set()
+                for word in opt_words:
+                    candidates.update(postings.get(word, ()))
+                
+                for position in sorted(candidates):
+                    orig_id, orig_bullet = original_items[position]
+                    if orig_id in used_original_ids:
+                        continue
+                    if self._word_sets_similar(opt_words, original_words[position]):
+                        used_original_ids.add(orig_id)
+                        return orig_bullet
+                return None
+            
             # Process optimized bullets
             for opt_bullet in optimized_bullets:
                 opt_text = opt_bullet.get("bullet_text", "")
                 opt_section = opt_bullet.get("section_name", "")
                 
                 # Block creation of new experience bullets
-                if opt_section.lower() in ["experience", "work experience", "professional experience"]:
+                if opt_section.lower() in _EXPERIENCE_SECTIONS:
                     # Check if this is a completely new bullet (not based on existing)
-                    is_new_experience = True
-                    original_bullet = None
-                    
-                    # Try to find matching original bullet
-                    for orig_id, orig_bullet in original_map.items():
-                        if orig_id in used_original_ids:
-                            continue
-                        
-                        orig_text = orig_bullet.get("bullet_text", "")
-                        
-                        # Check for similarity (simple word overlap check)
-                        if self._bullets_similar(opt_text, orig_text):
-                            is_new_experience = False
-                            original_bullet = orig_bullet
-                            used_original_ids.add(orig_id)
-                            break
+                    original_bullet = find_original(opt_text)
                     
                     # Block if it's a new experience bullet
-                    if is_new_experience:
+                    if original_bullet is None:
                         self.logger.warning(f"Blocked creation of new experience bullet: {opt_text[:50]}...")
                         continue
                     
                     # Generate delta for modified experience bullet
                     if original_bullet:
-                        delta_id = self._create_delta(
+                        pending_rows.append(self._build_delta_row(
                             user_id, optimization_id, "modify", opt_section,
                             original_bullet["bullet_text"], opt_text,
                             f"Rephrased bullet with applied terms: {', '.join(applied_terms)}"
-                        )
-                        if delta_id:
-                            delta_ids.append(delta_id)
+                        ))
                 
                 else:
                     # Non-experience bullets - allow modifications
                     # Try to find matching original bullet
-                    original_bullet = None
-                    for orig_id, orig_bullet in original_map.items():
-                        if orig_id in used_original_ids:
-                            continue
-                        
-                        if self._bullets_similar(opt_text, orig_bullet.get("bullet_text", "")):
-                            original_bullet = orig_bullet
-                            used_original_ids.add(orig_id)
-                            break
+                    original_bullet = find_original(opt_text)
                     
                     if original_bullet:
                         # Modified existing bullet
-                        delta_id = self._create_delta(
+                        pending_rows.append(self._build_delta_row(
                             user_id, optimization_id, "modify", opt_section,
                             original_bullet["bullet_text"], opt_text,
                             "Modified bullet for job optimization"
-                        )
+                        ))
                     else:
                         # New non-experience bullet (allowed)
-                        delta_id = self._create_delta(
+                        pending_rows.append(self._build_delta_row(
                             user_id, optimization_id, "add", opt_section,
                             "", opt_text,
                             "Added new bullet point"
-                        )
-                    
-                    if delta_id:
-                        delta_ids.append(delta_id)
+                        ))
             
             # Handle omitted bullets (original bullets not used)
             for orig_id, orig_bullet in original_map.items():
                 if orig_id not in used_original_ids:
-                    delta_id = self._create_delta(
+                    pending_rows.append(self._build_delta_row(
                         user_id, optimization_id, "remove", orig_bullet.get("section_name", ""),
                         orig_bullet["bullet_text"], "",
                         "Removed bullet to focus on job-relevant content"
-                    )
-                    if delta_id:
-                        delta_ids.append(delta_id)
+                    ))
+            
+            delta_ids = []
+            if pending_rows:
+                result = self.sb.table("resume_deltas").insert(pending_rows).execute()
+                delta_ids = [row["id"] for row in result.data or []]
             
             self.logger.info(f"Generated {len(delta_ids)} deltas for optimization {optimization_id}")
             return delta_ids
@@ -182,19 +189,23 @@ class ResumeDeltaService:
     
     def _bullets_similar(self, text1: str, text2: str, threshold: float = 0.3) -> bool:
         """Check if two bullet texts are similar based on word overlap."""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 or not words2:
+        return self._word_sets_similar(set(text1.lower().split()), set(text2.lower().split()), threshold)
+    
+    def _word_sets_similar(self, words1: frozenset, words2: frozenset, threshold: float = 0.3) -> bool:
+        """Jaccard word-overlap check on already tokenized bullets."""
+        size1, size2 = len(words1), len(words2)
+        if not size1 or not size2:
             return False
         
-        intersection = words1 & words2
-        union = words1 | words2
+        # Jaccard can't exceed min/max of the set sizes, so very different lengths fail without intersecting
+        if min(size1, size2) / max(size1, size2) < threshold:
+            return False
         
-        similarity = len(intersection) / len(union) if union else 0
+        shared = len(words1 & words2)
+        similarity = shared / (size1 + size2 - shared)
         return similarity >= threshold
     
-    def _create_delta(
+    def _build_delta_row(
         self, 
         user_id: str, 
         optimization_id: str, 
@@ -203,34 +214,24 @@ class ResumeDeltaService:
         original_content: str,
         new_content: str,
         reasoning: str
-    ) -> Optional[str]:
-        """Create a resume delta record."""
-        try:
-            delta_data = {
-                "user_id": user_id,
-                "optimization_id": optimization_id,
-                "change_type": change_type,
-                "section_name": section_name,
-                "original_content": original_content,
-                "new_content": new_content,
-                "reasoning": reasoning
-            }
-            
-            result = self.sb.table("resume_deltas").insert(delta_data).execute()
-            
-            if result.data:
-                return result.data[0]["id"]
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Error creating delta: {str(e)}")
-            return None
+    ) -> Dict[str, Any]:
+        """Build a resume delta record for the batched insert in generate_deltas."""
+        return {
+            "user_id": user_id,
+            "optimization_id": optimization_id,
+            "change_type": change_type,
+            "section_name": section_name,
+            "original_content": original_content,
+            "new_content": new_content,
+            "reasoning": reasoning
+        }
     
     def get_optimization_deltas(self, optimization_id: str) -> List[Dict[str, Any]]:
         """Get all deltas for a specific optimization."""
         try:
-            result = self.sb.table("resume_deltas").select("*").eq(
+            result = self.sb.table("resume_deltas").select(
+                "id, change_type, section_name, original_content, new_content, reasoning, created_at"
+            ).eq(
                 "optimization_id", optimization_id
             ).order("created_at").execute()
             
@@ -253,17 +254,19 @@ class ResumeDeltaService:
             mapping_ids = []
             mapping_strengths = mapping_strengths or [1.0] * len(concept_mapping_ids)
             
-            for i, concept_mapping_id in enumerate(concept_mapping_ids):
-                mapping_data = {
+            mapping_rows = [
+                {
                     "translation_event_id": translation_event_id,
                     "concept_mapping_id": concept_mapping_id,
                     "mapping_strength": mapping_strengths[i] if i < len(mapping_strengths) else 1.0
                 }
-                
-                result = self.sb.table("translation_event_mappings").insert(mapping_data).execute()
-                
-                if result.data:
-                    mapping_ids.append(result.data[0]["id"])
+                for i, concept_mapping_id in enumerate(concept_mapping_ids)
+            ]
+            
+            # One insert for every mapping instead of a round trip each
+            if mapping_rows:
+                result = self.sb.table("translation_event_mappings").insert(mapping_rows).execute()
+                mapping_ids = [row["id"] for row in result.data or []]
             
             self.logger.info(f"Created {len(mapping_ids)} translation event mappings")
             return mapping_ids
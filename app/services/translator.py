@@ -9,6 +9,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Demo company styles, keyed by lowercased company name
+_DEMO_COMPANY_STYLES = {
+    "stripe": {
+        "payment": "financial transaction",
+        "merchant": "business customer",
+        "api": "developer interface"
+    },
+    "epic": {
+        "game": "interactive experience",
+        "player": "user",
+        "monetization": "revenue optimization"
+    }
+}
+
 
 class TranslatorService:
     """
@@ -127,21 +141,8 @@ class TranslatorService:
         Returns:
             Dictionary of term preferences for the company
         """
-        # Demo company styles
-        demo_styles = {
-            "stripe": {
-                "payment": "financial transaction",
-                "merchant": "business customer",
-                "api": "developer interface"
-            },
-            "epic": {
-                "game": "interactive experience",
-                "player": "user",
-                "monetization": "revenue optimization"
-            }
-        }
-        
-        return demo_styles.get(company.lower(), {})
+        # Copy so callers can't modify the shared style table
+        return dict(_DEMO_COMPANY_STYLES.get(company.lower(), {}))
     
     def validate_translation_quality(self, original: str, translated: str) -> Dict[str, any]:
         """
@@ -3,6 +3,7 @@
 Comprehensive calibration report for SmartApply concept matcher.
 """
 
+import heapq
 import sys
 sys.path.append('.')
 from matching.concept_matcher import analyze_job_posting
@@ -70,7 +71,11 @@ job_samples = [
 def main():
     print('=== SMARTAPPLY CONCEPT MATCHER CALIBRATION REPORT ===\n')
 
+    # Count matches and collect zero-concept jobs while analyzing
     results = []
+    jobs_with_matches = 0
+    jobs_above_threshold = 0
+    zero_concept_jobs = []
     for job in job_samples:
         result = analyze_job_posting(
             job_description=job['description'],
@@ -79,13 +84,17 @@ def main():
             job_title=job['title']
         )
         results.append((job, result))
+        
+        fit_score = result.get('fit_score', 0)
+        if fit_score > 0:
+            jobs_with_matches += 1
+        if fit_score >= 10:
+            jobs_above_threshold += 1
+        if fit_score == 0:
+            zero_concept_jobs.append((job, result))
 
-    # Sort by fit_score descending
-    results.sort(key=lambda x: x[1].get('fit_score', 0), reverse=True)
-
-    # Count matches
-    jobs_with_matches = sum(1 for _, result in results if result.get('fit_score', 0) > 0)
-    jobs_above_threshold = sum(1 for _, result in results if result.get('fit_score', 0) >= 10)
+    # Only the top 5 by fit_score are shown, so no full sort
+    top_results = heapq.nlargest(5, results, key=lambda x: x[1].get('fit_score', 0))
 
     print('CALIBRATION SUMMARY:')
     print(f'  Total jobs tested: {len(results)}')
@@ -94,7 +103,7 @@ def main():
     print()
 
     print('TOP 5 JOBS BY FIT SCORE:')
-    for i, (job, analysis) in enumerate(results[:5], 1):
+    for i, (job, analysis) in enumerate(top_results, 1):
         fit_score = analysis.get('fit_score', 0)
         
         print(f'{i}. {job["company"]} - {job["title"]}')
@@ -111,7 +120,6 @@ def main():
         print()
 
     # Show jobs with 0 concepts (vocabulary gaps)
-    zero_concept_jobs = [(job, result) for job, result in results if result.get('fit_score', 0) == 0]
     if zero_concept_jobs:
         print('JOBS WITH ZERO CONCEPTS (Vocabulary Gaps):')
         for i, (job, result) in enumerate(zero_concept_jobs[:3], 1):
@@ -3,7 +3,7 @@ Configuration settings for the job application system.
 """
 
 import os
-from typing import List
+from typing import FrozenSet, List, Optional
 
 
 class Config:
@@ -12,39 +12,44 @@ class Config:
     def __init__(self):
         """Initialize configuration from environment variables."""
         
+        # Snapshot the environment once rather than calling os.getenv per setting
+        env = dict(os.environ)
+        
         # Service Integration Flags - Disabled for Human-in-the-Loop
-        self.USE_SLACK = os.getenv("USE_SLACK", "false").lower() == "true"  # Disabled
-        self.USE_AIRTABLE = os.getenv("USE_AIRTABLE", "false").lower() == "true"  # Disabled
-        self.ENABLE_SLACK = os.getenv("ENABLE_SLACK", "false").lower() == "true"  # Master flag
-        self.ENABLE_AIRTABLE = os.getenv("ENABLE_AIRTABLE", "false").lower() == "true"  # Master flag
+        self.USE_SLACK = env.get("USE_SLACK", "false").lower() == "true"  # Disabled
+        self.USE_AIRTABLE = env.get("USE_AIRTABLE", "false").lower() == "true"  # Disabled
+        self.ENABLE_SLACK = env.get("ENABLE_SLACK", "false").lower() == "true"  # Master flag
+        self.ENABLE_AIRTABLE = env.get("ENABLE_AIRTABLE", "false").lower() == "true"  # Master flag
         
         # API Keys and Tokens (optional now)
-        self.LEVER_API_KEY = os.getenv("LEVER_API_KEY", "")
-        self.GREENHOUSE_API_KEY = os.getenv("GREENHOUSE_API_KEY", "")
-        self.SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN", "") if self.USE_SLACK else ""
-        self.SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID", "") if self.USE_SLACK else ""
-        self.AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY", "") if self.USE_AIRTABLE else ""
-        self.AIRTABLE_BASE_ID = os.getenv("AIRTABLE_BASE_ID", "") if self.USE_AIRTABLE else ""
-        self.AIRTABLE_TABLE_NAME = os.getenv("AIRTABLE_TABLE_NAME", "Applications") if self.USE_AIRTABLE else ""
+        self.LEVER_API_KEY = env.get("LEVER_API_KEY", "")
+        self.GREENHOUSE_API_KEY = env.get("GREENHOUSE_API_KEY", "")
+        self.SLACK_BOT_TOKEN = env.get("SLACK_BOT_TOKEN", "") if self.USE_SLACK else ""
+        self.SLACK_CHANNEL_ID = env.get("SLACK_CHANNEL_ID", "") if self.USE_SLACK else ""
+        self.AIRTABLE_API_KEY = env.get("AIRTABLE_API_KEY", "") if self.USE_AIRTABLE else ""
+        self.AIRTABLE_BASE_ID = env.get("AIRTABLE_BASE_ID", "") if self.USE_AIRTABLE else ""
+        self.AIRTABLE_TABLE_NAME = env.get("AIRTABLE_TABLE_NAME", "Applications") if self.USE_AIRTABLE else ""
         
         # Job Matching Configuration - temporary calibration threshold
-        self.MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.10"))
+        self.MATCH_THRESHOLD = float(env.get("MATCH_THRESHOLD", "0.10"))
         
         # SmartApply Human-in-the-Loop Configuration
-        self.USE_CLAUDE_FALLBACK = os.getenv("USE_CLAUDE_FALLBACK", "false").lower() == "true"  # Disabled for human-loop
-        self.CLAUDE_DAILY_LIMIT_PER_COMPANY = int(os.getenv("CLAUDE_DAILY_LIMIT_PER_COMPANY", "10"))
-        self.LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "7"))
+        self.USE_CLAUDE_FALLBACK = env.get("USE_CLAUDE_FALLBACK", "false").lower() == "true"  # Disabled for human-loop
+        self.CLAUDE_DAILY_LIMIT_PER_COMPANY = int(env.get("CLAUDE_DAILY_LIMIT_PER_COMPANY", "10"))
+        self.LLM_CACHE_TTL_DAYS = int(env.get("LLM_CACHE_TTL_DAYS", "7"))
         
         # Target Companies (no longer used for filtering, kept for backward compatibility)
-        companies_str = os.getenv("TARGET_COMPANIES", "")
-        self.TARGET_COMPANIES = [company.strip() for company in companies_str.split(",") if company.strip()] if companies_str else []
+        companies_str = env.get("TARGET_COMPANIES", "")
+        self.TARGET_COMPANIES: FrozenSet[str] = frozenset(
+            company.strip() for company in companies_str.split(",") if company.strip()
+        )
         
         # Scheduling Configuration
-        self.CHECK_INTERVAL_MINUTES = int(os.getenv("CHECK_INTERVAL_MINUTES", "15"))
+        self.CHECK_INTERVAL_MINUTES = int(env.get("CHECK_INTERVAL_MINUTES", "15"))
         
         # Logging Configuration
-        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-        self.LOG_FILE = os.getenv("LOG_FILE", "job_application_system.log")
+        self.LOG_LEVEL = env.get("LOG_LEVEL", "INFO")
+        self.LOG_FILE = env.get("LOG_FILE", "job_application_system.log")
         
         # Validate required configuration
         self._validate_config()
@@ -73,3 +78,14 @@ class Config:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
         
         # Supabase credentials are handled by the repository layer
+
+
+_CONFIG_SINGLETON: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """Return the process-wide Config, building it on first use."""
+    global _CONFIG_SINGLETON
+    if _CONFIG_SINGLETON is None:
+        _CONFIG_SINGLETON = Config()
+    return _CONFIG_SINGLETON
@@ -8,10 +8,11 @@ import logging
 import time
 import threading
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 from datetime import datetime
 
-from config import Config
+from config import get_config
 from api_clients.lever_client import LeverClient
 from api_clients.greenhouse_client import GreenhouseClient
 from api_clients.slack_client import SlackClient
@@ -37,7 +38,7 @@ if SUPABASE_URL and SUPABASE_KEY:
     SB: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
     REPO = SupabaseRepo(SUPABASE_URL, SUPABASE_KEY)
     EXTRACTOR = ConceptExtractor(SB)
-    TRANSLATOR = ConceptTranslator(SB, Config())
+    TRANSLATOR = ConceptTranslator(SB, get_config())
     INGEST_TRACKER = IngestRunTracker(SB)
     API_TRACKER = APICallTracker(SB)
     RESUME_DELTA_SERVICE = ResumeDeltaService(SB)
@@ -54,9 +55,12 @@ else:
 class JobApplicationSystem:
     """Main job application automation system."""
     
+    # Cap on analyses carried over between cycles while Supabase writes are failing
+    MAX_UNSTORED_ANALYSES = 1000
+    
     def __init__(self):
         """Initialize the job application system."""
-        self.config = Config()
+        self.config = get_config()
         self.logger = setup_logger()
         
         # Initialize API clients
@@ -79,6 +83,8 @@ class JobApplicationSystem:
         self.ingest_tracker = INGEST_TRACKER
         self.api_tracker = API_TRACKER
         self.resume_delta_service = RESUME_DELTA_SERVICE
+        # PM job analyses whose Supabase write failed; retried with the next cycle's batch
+        self._unstored_analyses: List[Dict[str, Any]] = []
         
         # Log integration status  
         integrations = []
@@ -98,23 +104,32 @@ class JobApplicationSystem:
     
     def fetch_all_jobs(self) -> List[Dict[str, Any]]:
         """Fetch jobs from all available sources."""
-        all_jobs = []
+        use_supabase = bool(self.repo)
+        sources = {
+            "Lever": self.lever_client,
+            "Greenhouse": self.greenhouse_client,
+        }
+        results: Dict[str, List[Dict[str, Any]]] = {}
         
-        # Fetch from Lever - using Supabase company list if available
-        try:
-            lever_jobs = self.lever_client.fetch_all_jobs(use_supabase=bool(self.repo))
-            all_jobs.extend(lever_jobs)
-            self.logger.info(f"Fetched {len(lever_jobs)} jobs from Lever")
-        except Exception as e:
-            self.logger.error(f"Error fetching Lever jobs: {str(e)}")
+        # Both sources are network-bound, so fetch them concurrently
+        # (Supabase company list is used by each client if available)
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {
+                executor.submit(client.fetch_all_jobs, use_supabase=use_supabase): source
+                for source, client in sources.items()
+            }
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    results[source] = future.result()
+                    self.logger.info(f"Fetched {len(results[source])} jobs from {source}")
+                except Exception as e:
+                    self.logger.error(f"Error fetching {source} jobs: {str(e)}")
         
-        # Fetch from Greenhouse - using Supabase company list if available
-        try:
-            greenhouse_jobs = self.greenhouse_client.fetch_all_jobs(use_supabase=bool(self.repo))
-            all_jobs.extend(greenhouse_jobs)
-            self.logger.info(f"Fetched {len(greenhouse_jobs)} jobs from Greenhouse")
-        except Exception as e:
-            self.logger.error(f"Error fetching Greenhouse jobs: {str(e)}")
+        # Keep source order stable regardless of which fetch finished first
+        all_jobs = []
+        for source in sources:
+            all_jobs.extend(results.get(source, []))
         
         return all_jobs
     
@@ -127,85 +142,109 @@ class JobApplicationSystem:
         
         self.logger.info(f"Processing {len(jobs)} jobs for matching...")
         
-        for job in jobs:
-            try:
-                # Debug: Check if this is a PM role
-                is_pm = self.keyword_matcher.is_product_manager_role(job)
-                if is_pm:
-                    pm_jobs_found += 1
-                    self.logger.info(f"Found PM job: {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')} (ID: {job.get('id', 'unknown')})")
-                
-                # Check if job already processed
-                if self.job_storage.is_job_processed(job['id']):
+        # Look up processed IDs once up front and persist new ones in a single write
+        already_processed = self.job_storage.get_processed_ids(job.get('id') for job in jobs)
+        to_mark = []
+        pending_analyses = []
+        
+        # Saved in a finally so jobs handled before a crash or interrupt are not reprocessed.
+        # Jobs are marked even if their analysis fails to store (they may already be notified);
+        # only the analysis write is retried next cycle
+        try:
+            for job in jobs:
+                try:
+                    # Debug: Check if this is a PM role
+                    is_pm = self.keyword_matcher.is_product_manager_role(job)
                     if is_pm:
-                        self.logger.info(f"PM job {job['id']} already processed - skipping")
-                    continue
-                
-                # Match job to resume profiles
-                match_result = self.keyword_matcher.match_job(job)
-                
-                if is_pm:
-                    pm_jobs_processed += 1
-                    self.logger.info(f"PM job {job['id']} matching result: score={match_result['best_match_score']}%, resume={match_result.get('best_resume', 'None')}, threshold={self.config.MATCH_THRESHOLD * 100}%")
+                        pm_jobs_found += 1
+                        self.logger.info(f"Found PM job: {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')} (ID: {job.get('id', 'unknown')})")
                     
-                    # Store ALL PM jobs in Supabase regardless of score - this is key for optimization
-                    if self.repo:
-                        try:
-                            fit_score = float(match_result["best_match_score"]) / 100.0
-                            reasoning = match_result.get("recommendation", "")
-                            vocabulary_gaps = []  # Could be computed later
-                            strategy = f"Use {match_result.get('best_resume','')}"
-                            
-                            self.repo.store_job_analysis(
-                                company_name=job.get("company", ""),
-                                role_title=job.get("title", ""),
-                                job_url=job.get("url", ""),
-                                job_description=job.get("description", ""),
-                                fit_score=fit_score,
-                                reasoning=reasoning,
-                                vocabulary_gaps=vocabulary_gaps,
-                                optimization_strategy=strategy,
-                            )
-                            
-                            self.logger.info(f"Stored PM job analysis in Supabase: {job['title']} (fit: {fit_score:.2f})")
-                            
-                        except Exception as e:
-                            self.logger.warning(f"Supabase storage failed for PM job {job.get('id', 'unknown')}: {e}")
-                
-                # Only send notifications for jobs above threshold
-                if match_result['best_match_score'] >= (self.config.MATCH_THRESHOLD * 100):  # Convert threshold to percentage
-                    job['match_result'] = match_result
+                    # Check if job already processed
+                    if job['id'] in already_processed:
+                        if is_pm:
+                            self.logger.info(f"PM job {job['id']} already processed - skipping")
+                        continue
+                    
+                    # Match job to resume profiles
+                    match_result = self.keyword_matcher.match_job(job)
                     
                     if is_pm:
-                        pm_jobs_matched += 1
+                        pm_jobs_processed += 1
+                        self.logger.info(f"PM job {job['id']} matching result: score={match_result['best_match_score']}%, resume={match_result.get('best_resume', 'None')}, threshold={self.config.MATCH_THRESHOLD * 100}%")
+                        
+                        # Store ALL PM jobs in Supabase regardless of score - this is key for optimization
+                        if self.repo:
+                            pending_analyses.append({
+                                "company_name": job.get("company", ""),
+                                "role_title": job.get("title", ""),
+                                "job_url": job.get("url", ""),
+                                "job_description": job.get("description", ""),
+                                "fit_score": float(match_result["best_match_score"]) / 100.0,
+                                "reasoning": match_result.get("recommendation", ""),
+                                "vocabulary_gaps": [],  # Could be computed later
+                                "optimization_strategy": f"Use {match_result.get('best_resume','')}",
+                            })
                     
-                    # Extract concepts using Supabase if available
-                    if self.extractor:
-                        try:
-                            job["extracted_concepts"] = self.extractor.extract(job.get("description", ""))
-                        except Exception as e:
-                            self.logger.warning(f"Concept extraction failed for job {job['id']}: {str(e)}")
+                    # Only send notifications for jobs above threshold
+                    if match_result['best_match_score'] >= (self.config.MATCH_THRESHOLD * 100):  # Convert threshold to percentage
+                        job['match_result'] = match_result
+                        
+                        if is_pm:
+                            pm_jobs_matched += 1
+                        
+                        # Extract concepts using Supabase if available
+                        if self.extractor:
+                            try:
+                                job["extracted_concepts"] = self.extractor.extract(job.get("description", ""))
+                            except Exception as e:
+                                self.logger.warning(f"Concept extraction failed for job {job['id']}: {str(e)}")
+                                job["extracted_concepts"] = []
+                        else:
                             job["extracted_concepts"] = []
+                        
+                        processed_jobs.append(job)
+                        
+                        self.logger.info(f"Job {job['id']} matched with score {match_result['best_match_score']}% - SENDING NOTIFICATION")
                     else:
-                        job["extracted_concepts"] = []
+                        # Log suppressed PM jobs for visibility
+                        if is_pm and match_result['best_match_score'] > 0:
+                            self.logger.info(f"PM job {job['id']} ({job.get('title', 'Unknown')}) scored {match_result['best_match_score']}% - STORED BUT SUPPRESSED (below {self.config.MATCH_THRESHOLD * 100}% threshold)")
                     
-                    processed_jobs.append(job)
+                    # Mark job as processed regardless of score
+                    already_processed.add(job['id'])
+                    to_mark.append(job['id'])
                     
-                    self.logger.info(f"Job {job['id']} matched with score {match_result['best_match_score']}% - SENDING NOTIFICATION")
-                else:
-                    # Log suppressed PM jobs for visibility
-                    if is_pm and match_result['best_match_score'] > 0:
-                        self.logger.info(f"PM job {job['id']} ({job.get('title', 'Unknown')}) scored {match_result['best_match_score']}% - STORED BUT SUPPRESSED (below {self.config.MATCH_THRESHOLD * 100}% threshold)")
-                
-                # Mark job as processed regardless of score
-                self.job_storage.mark_job_processed(job['id'])
-                
-            except Exception as e:
-                self.logger.error(f"Error processing job {job.get('id', 'unknown')}: {str(e)}")
+                except Exception as e:
+                    self.logger.error(f"Error processing job {job.get('id', 'unknown')}: {str(e)}")
+        finally:
+            self.job_storage.mark_batch(to_mark)
+            self._store_pending_analyses(pending_analyses)
         
         self.logger.info(f"Job processing summary: {pm_jobs_found} PM jobs found, {pm_jobs_processed} processed, {pm_jobs_matched} matched above threshold")
         return processed_jobs
     
+    def _store_pending_analyses(self, pending_analyses: List[Dict[str, Any]]):
+        """Store this cycle's PM job analyses plus any left over from earlier cycles in one batched call."""
+        analyses = self._unstored_analyses + pending_analyses
+        if not analyses:
+            return
+        
+        try:
+            analysis_ids = self.repo.store_job_analyses(analyses)
+            unstored = [analysis for analysis, analysis_id in zip(analyses, analysis_ids) if analysis_id is None]
+        except Exception as e:
+            self.logger.warning(f"Supabase storage failed for {len(analyses)} PM job analyses: {e}")
+            unstored = analyses
+        
+        if len(unstored) > self.MAX_UNSTORED_ANALYSES:
+            self.logger.warning(f"Dropping {len(unstored) - self.MAX_UNSTORED_ANALYSES} oldest unstored PM job analyses")
+            unstored = unstored[-self.MAX_UNSTORED_ANALYSES:]
+        self._unstored_analyses = unstored
+        
+        self.logger.info(f"Stored {len(analyses) - len(unstored)} PM job analyses in Supabase")
+        if unstored:
+            self.logger.warning(f"{len(unstored)} PM job analyses not stored - will retry next cycle")
+    
     def send_notifications(self, matched_jobs: List[Dict[str, Any]]):
         """Send Slack notifications for matched jobs."""
         for job in matched_jobs:
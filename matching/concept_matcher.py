@@ -3,6 +3,11 @@ import logging
 from typing import Dict, Tuple, List, Any
 from collections import defaultdict
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Initialize calibration logger
 calib_logger = logging.getLogger('calibration')
 calib_handler = logging.FileHandler('calib.log', mode='w')  # Truncate file at start
@@ -76,6 +81,14 @@ for resume, concept_map in CONCEPT_MAP.items():
         for keyword in keywords:
             KEYWORD_LOOKUP[keyword.lower()] = (resume, concept)
 
+# One automaton over every keyword finds all of them, overlaps included, in a single pass
+KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for keyword in KEYWORD_LOOKUP:
+        KEYWORD_AUTOMATON.add_word(keyword, keyword)
+    KEYWORD_AUTOMATON.make_automaton()
+
 # === CLEANING AND MATCHING FUNCTIONS ===
 
 def clean_text(text: str) -> str:
@@ -84,8 +97,13 @@ def clean_text(text: str) -> str:
 def calculate_concept_alignment(job_description: str) -> Dict[str, Dict[str, int]]:
     cleaned = clean_text(job_description)
     concept_scores = defaultdict(lambda: defaultdict(int))
+    if KEYWORD_AUTOMATON is not None:
+        found = {keyword for _, keyword in KEYWORD_AUTOMATON.iter(cleaned)}
+    else:
+        found = {keyword for keyword in KEYWORD_LOOKUP if keyword in cleaned}
+    # Walk KEYWORD_LOOKUP (not the hits) so scores keep their usual insertion order
     for keyword, (resume, concept) in KEYWORD_LOOKUP.items():
-        if keyword in cleaned:
+        if keyword in found:
             concept_scores[resume][concept] += 1
     return dict(concept_scores)
 
@@ -31,9 +31,10 @@ create table users (
 -- 2) COMPANIES
 create table companies (
   id uuid primary key default gen_random_uuid(),
-  name text unique,
+  name text unique not null,
   language_patterns text[],
   worldview_tags text[],
+  name_normalized text generated always as (lower(regexp_replace(name, '[ -]', '', 'g'))) stored,
   created_at timestamp default now()
 );
 
@@ -96,6 +97,7 @@ create table role_analysis (
 create table concept_mappings (
   id uuid primary key default gen_random_uuid(),
   raw_term text not null,
+  raw_term_lc text generated always as (lower(raw_term)) stored,
   concept_id uuid references concepts(id) on delete cascade,
   confidence_score numeric default 0.5 check (confidence_score >= 0.0 and confidence_score <= 1.0),
   successful_match_count integer default 0,
@@ -126,11 +128,34 @@ create table translation_events (
 );
 
 -- INDEXES for performance
+create index if not exists idx_companies_name_normalized on companies(name_normalized);
 create index if not exists idx_job_postings_company_id on job_postings(company_id);
 create index if not exists idx_job_postings_url on job_postings(job_url);
 create index if not exists idx_concept_mappings_term on concept_mappings(raw_term);
 create index if not exists idx_concept_mappings_concept_id on concept_mappings(concept_id);
-create index if not exists idx_applications_user_job on applications(user_id, job_posting_id);
+-- database_stats() top_concepts reads the first rows of this instead of sorting every mapping
+create index if not exists idx_concept_mappings_match_count on concept_mappings(successful_match_count desc nulls last);
+-- Composite lookups used by the repository (job_url, users.email, companies.name and
+-- concepts.name are already covered by their unique constraints)
+create unique index if not exists idx_applications_user_job on applications(user_id, job_posting_id);
+create unique index if not exists idx_concept_mappings_term_concept_company on concept_mappings
+  (raw_term_lc, concept_id, coalesce(company_id, '00000000-0000-0000-0000-000000000000'::uuid));
+
+-- updated_at triggers (the repository no longer stamps updated_at itself)
+create or replace function update_timestamp() returns trigger as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$ language plpgsql;
+
+create trigger trg_job_postings_updated
+before update on job_postings
+for each row execute function update_timestamp();
+
+create trigger trg_applications_updated
+before update on applications
+for each row execute function update_timestamp();
 
 -- RLS (Row Level Security) setup for multi-user support
 alter table users enable row level security;
@@ -142,6 +167,267 @@ alter table applications enable row level security;
 create policy "Users can view own data" on users for select using (auth.uid() = id);
 create policy "Users can update own data" on users for update using (auth.uid() = id);
 
+-- Fit score aggregate kept out of the request path; refreshed nightly, e.g. with pg_cron:
+--   select cron.schedule('refresh-role-analysis-stats', '0 3 * * *', 'select refresh_role_analysis_stats()');
+create materialized view if not exists role_analysis_stats as
+  select 1 as id, avg(fit_score) as avg_fit_score, count(*) as analysis_count from role_analysis;
+create unique index if not exists idx_role_analysis_stats_id on role_analysis_stats(id);
+
+-- Mappings with their concept name already joined, so the concept extractor loads flat rows
+create or replace view concept_mappings_flat with (security_invoker = true) as
+  select m.id, m.raw_term, m.concept_id, m.confidence_score, c.name as concept_name
+  from concept_mappings m
+  join concepts c on c.id = m.concept_id;
+
+-- RPC functions (called via supabase.rpc)
+-- This file is the canonical definition of every RPC the repositories call. sql/schema.sql
+-- (Rev A reference schema) carries matching definitions for its own table layout; the one
+-- RPC defined only there is store_translation_event_with_mappings, which writes the
+-- human-loop translation_events columns and translation_event_mappings table that this
+-- schema does not have.
+
+-- Cheap round trip for the API health check
+create or replace function ping() returns integer as $$
+  select 1;
+$$ language sql stable;
+
+-- Get-or-create lookups: one round trip on both hit and miss, existing rows are never
+-- overwritten, and a concurrent insert of the same key falls back to the winner's id.
+create or replace function get_or_create_user(p_email text, p_attrs jsonb default '{}') returns uuid as $$
+declare
+  v_id uuid;
+begin
+  select id into v_id from users where email = p_email;
+  if v_id is null then
+    insert into users (email, name)
+    select p_email, a.name
+    from jsonb_populate_record(null::users, p_attrs) as a
+    on conflict (email) do nothing
+    returning id into v_id;
+  end if;
+  if v_id is null then
+    select id into v_id from users where email = p_email;
+  end if;
+  return v_id;
+end;
+$$ language plpgsql;
+
+create or replace function get_or_create_company(p_name text, p_attrs jsonb default '{}') returns uuid as $$
+declare
+  v_id uuid;
+begin
+  select id into v_id from companies where name = p_name;
+  if v_id is null then
+    insert into companies (name, worldview_tags, language_patterns)
+    select p_name, coalesce(a.worldview_tags, '{}'), coalesce(a.language_patterns, '{}')
+    from jsonb_populate_record(null::companies, p_attrs) as a
+    on conflict (name) do nothing
+    returning id into v_id;
+  end if;
+  if v_id is null then
+    select id into v_id from companies where name = p_name;
+  end if;
+  return v_id;
+end;
+$$ language plpgsql;
+
+create or replace function get_or_create_concept(p_name text) returns uuid as $$
+declare
+  v_id uuid;
+begin
+  select id into v_id from concepts where name = p_name;
+  if v_id is null then
+    insert into concepts (name) values (p_name)
+    on conflict (name) do nothing
+    returning id into v_id;
+  end if;
+  if v_id is null then
+    select id into v_id from concepts where name = p_name;
+  end if;
+  return v_id;
+end;
+$$ language plpgsql;
+
+-- Resolves the concept and the raw_term -> concept mapping in one call; an existing mapping
+-- (matched case-insensitively, any company) is returned as-is
+create or replace function get_or_create_concept_mapping(
+  p_raw_term text,
+  p_concept_name text,
+  p_confidence_score numeric default 0.5,
+  p_user_id uuid default null,
+  p_company_id uuid default null
+) returns uuid as $$
+declare
+  v_concept_id uuid := get_or_create_concept(p_concept_name);
+  v_id uuid;
+begin
+  select id into v_id from concept_mappings
+  where raw_term_lc = lower(p_raw_term) and concept_id = v_concept_id
+  limit 1;
+  if v_id is null then
+    insert into concept_mappings (raw_term, concept_id, confidence_score, user_id, company_id)
+    values (p_raw_term, v_concept_id, p_confidence_score, p_user_id, p_company_id)
+    on conflict do nothing
+    returning id into v_id;
+  end if;
+  if v_id is null then
+    select id into v_id from concept_mappings
+    where raw_term_lc = lower(p_raw_term) and concept_id = v_concept_id
+    limit 1;
+  end if;
+  return v_id;
+end;
+$$ language plpgsql;
+
+-- Atomic successful_match_count bump; returns the new count so callers never need a follow-up read
+create or replace function increment_match_count(mapping_id uuid) returns integer as $$
+  update concept_mappings
+  set successful_match_count = coalesce(successful_match_count, 0) + 1
+  where id = mapping_id
+  returning successful_match_count;
+$$ language sql;
+
+create or replace function refresh_role_analysis_stats() returns void as $$
+  refresh materialized view concurrently role_analysis_stats;
+$$ language sql security definer;
+
+-- Dashboard stats in one round trip instead of a count request per table
+create or replace function database_stats() returns json as $$
+  select json_build_object(
+    'users_count', (select count(*) from users),
+    'companies_count', (select count(*) from companies),
+    'concepts_count', (select count(*) from concepts),
+    'job_postings_count', (select count(*) from job_postings),
+    'applications_count', (select count(*) from applications),
+    'concept_mappings_count', (select count(*) from concept_mappings),
+    'translation_events_count', (select count(*) from translation_events),
+    'avg_fit_score', (select coalesce(avg_fit_score, 0) from role_analysis_stats),
+    'top_concepts', (select coalesce(json_agg(x), '[]') from (
+      select concept_id, successful_match_count from concept_mappings
+      order by successful_match_count desc nulls last limit 5
+    ) x)
+  );
+$$ language sql stable;
+
+-- Company lookup, job posting upsert and role analysis insert as one transaction
+create or replace function store_job_analysis(
+  p_company_name text,
+  p_role_title text,
+  p_job_url text,
+  p_job_description text,
+  p_fit_score numeric,
+  p_reasoning text,
+  p_vocabulary_gaps text[] default '{}',
+  p_optimization_strategy text default null
+) returns uuid as $$
+declare
+  v_company_id uuid;
+  v_job_posting_id uuid;
+  v_analysis_id uuid;
+begin
+  if coalesce(p_company_name, '') <> '' then
+    select id into v_company_id from companies where name = p_company_name;
+    if v_company_id is null then
+      insert into companies (name) values (p_company_name)
+      on conflict (name) do nothing
+      returning id into v_company_id;
+    end if;
+    if v_company_id is null then
+      select id into v_company_id from companies where name = p_company_name;
+    end if;
+  end if;
+
+  insert into job_postings (company_name, role_title, job_url, job_description, company_id)
+  values (p_company_name, p_role_title, p_job_url, p_job_description, v_company_id)
+  on conflict (job_url) do update
+    set company_name = excluded.company_name,
+        role_title = excluded.role_title,
+        job_description = excluded.job_description,
+        company_id = excluded.company_id
+  returning id into v_job_posting_id;
+
+  insert into role_analysis (job_posting_id, fit_score, reasoning, vocabulary_gaps, optimization_strategy)
+  values (v_job_posting_id, p_fit_score, p_reasoning, coalesce(p_vocabulary_gaps, '{}'), p_optimization_strategy)
+  returning id into v_analysis_id;
+
+  return v_analysis_id;
+end;
+$$ language plpgsql;
+
+-- Batched job posting upsert on job_url. Expects a json array of objects keyed by column name
+-- (company_id already resolved). Existing rows keep their stored posted_at, company and role
+-- columns when the new row has no value for them.
+create or replace function store_job_postings(p_jobs jsonb) returns table (id uuid, job_url text) as $$
+  insert into job_postings as jp (company_name, role_title, job_url, job_description, company_id, extracted_concepts, posted_at)
+  select r.company_name, r.role_title, r.job_url, r.job_description, r.company_id,
+         coalesce(r.extracted_concepts, '{}'), r.posted_at
+  from jsonb_to_recordset(p_jobs) as r(
+    company_name text, role_title text, job_url text, job_description text,
+    company_id uuid, extracted_concepts text[], posted_at timestamp
+  )
+  on conflict (job_url) do update
+    set company_name = coalesce(excluded.company_name, jp.company_name),
+        role_title = coalesce(excluded.role_title, jp.role_title),
+        job_description = excluded.job_description,
+        extracted_concepts = excluded.extracted_concepts,
+        company_id = coalesce(excluded.company_id, jp.company_id),
+        posted_at = coalesce(excluded.posted_at, jp.posted_at)
+  returning jp.id, jp.job_url;
+$$ language sql;
+
+-- Batch form of store_job_analysis: one round trip per call.
+-- Expects a json array of objects keyed like the store_job_analysis parameters (without p_).
+-- Each row runs in its own subtransaction; a failing row yields NULL at its position
+-- instead of rolling back the rest of the batch.
+create or replace function store_job_analyses(p_analyses jsonb) returns uuid[] as $$
+declare
+  v_analysis jsonb;
+  v_ids uuid[] := '{}';
+begin
+  for v_analysis in select value from jsonb_array_elements(p_analyses) with ordinality order by ordinality loop
+    begin
+      v_ids := v_ids || store_job_analysis(
+        v_analysis->>'company_name',
+        v_analysis->>'role_title',
+        v_analysis->>'job_url',
+        v_analysis->>'job_description',
+        (v_analysis->>'fit_score')::numeric,
+        v_analysis->>'reasoning',
+        array(select jsonb_array_elements_text(coalesce(v_analysis->'vocabulary_gaps', '[]'))),
+        v_analysis->>'optimization_strategy'
+      );
+    exception when others then
+      raise warning 'store_job_analyses: skipped % (%)', v_analysis->>'job_url', sqlerrm;
+      v_ids := v_ids || null::uuid;
+    end;
+  end loop;
+  return v_ids;
+end;
+$$ language plpgsql;
+
+-- Learning event insert and successful_match_count bump as one transaction
+create or replace function record_translation_event(
+  p_concept_mapping_id uuid,
+  p_application_id uuid,
+  p_event_type text default 'success'
+) returns uuid as $$
+declare
+  v_event_id uuid;
+begin
+  insert into translation_events (concept_mapping_id, application_id, event_type)
+  values (p_concept_mapping_id, p_application_id, p_event_type)
+  returning id into v_event_id;
+
+  if p_event_type = 'success' then
+    update concept_mappings
+    set successful_match_count = coalesce(successful_match_count, 0) + 1
+    where id = p_concept_mapping_id;
+  end if;
+
+  return v_event_id;
+end;
+$$ language plpgsql;
+
 -- Insert sample data to test the schema
 -- Sample companies
 insert into companies (name, worldview_tags, language_patterns) values
@@ -22,6 +22,8 @@ CREATE TABLE companies (
     domain VARCHAR(255),
     worldview_tags TEXT[] DEFAULT '{}',
     language_patterns JSONB DEFAULT '{}',
+    -- Job board slug form (lowercase, no spaces or hyphens) used by the fetchers
+    name_normalized TEXT GENERATED ALWAYS AS (lower(regexp_replace(name, '[ -]', '', 'g'))) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -37,6 +39,7 @@ CREATE TABLE concepts (
 CREATE TABLE concept_mappings (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     raw_term VARCHAR(255) NOT NULL,
+    raw_term_lc TEXT GENERATED ALWAYS AS (lower(raw_term)) STORED,
     concept_id UUID REFERENCES concepts(id),
     company_id UUID REFERENCES companies(id),
     confidence_score DECIMAL(3,2) CHECK (confidence_score >= 0 AND confidence_score <= 1),
@@ -158,7 +161,7 @@ CREATE TABLE applications (
     job_posting_id UUID REFERENCES job_postings(id),
     resume_optimization_id UUID REFERENCES resume_optimizations(id),
     status VARCHAR(50) DEFAULT 'applied',
-    submitted_at TIMESTAMP WITH TIME ZONE,
+    submitted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     feedback TEXT,
     outcome VARCHAR(50),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -250,6 +253,7 @@ CREATE TABLE llm_cache (
 
 CREATE INDEX idx_concept_mappings_raw_term ON concept_mappings (lower(raw_term));
 CREATE INDEX idx_concept_mappings_company ON concept_mappings (company_id);
+CREATE INDEX idx_companies_name_normalized ON companies (name_normalized);
 CREATE INDEX idx_job_postings_company ON job_postings (company_id);
 CREATE INDEX idx_job_postings_title ON job_postings (lower(title));
 CREATE INDEX idx_role_analyses_job ON role_analyses (job_posting_id);
@@ -257,6 +261,17 @@ CREATE INDEX idx_role_analyses_user ON role_analyses (user_id);
 CREATE INDEX idx_applications_user ON applications (user_id);
 CREATE INDEX idx_translation_events_user ON translation_events (user_id);
 
+-- Conflict target for concept mapping upserts (NULL company_id = global mapping); also
+-- serves raw_term_lc + concept_id lookups from the repository
+CREATE UNIQUE INDEX idx_concept_mappings_term_concept_company ON concept_mappings
+    (raw_term_lc, concept_id, COALESCE(company_id, '00000000-0000-0000-0000-000000000000'::uuid));
+
+-- Mappings with their concept name already joined, so the concept extractor loads flat rows
+CREATE OR REPLACE VIEW concept_mappings_flat WITH (security_invoker = true) AS
+    SELECT m.id, m.raw_term, m.concept_id, m.confidence_score, c.name AS concept_name
+    FROM concept_mappings m
+    JOIN concepts c ON c.id = m.concept_id;
+
 -- Row Level Security (RLS) Policies
 
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -293,5 +308,162 @@ CREATE TRIGGER update_companies_updated_at BEFORE UPDATE ON companies
 CREATE TRIGGER update_concept_mappings_updated_at BEFORE UPDATE ON concept_mappings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_job_postings_updated_at BEFORE UPDATE ON job_postings
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_applications_updated_at BEFORE UPDATE ON applications
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- RPC Functions (called via supabase.rpc)
+-- schema_fixed.sql holds the canonical definition of every RPC the repositories call; these
+-- mirror them for the Rev A table layout. store_translation_event_with_mappings is defined
+-- here only, since it needs the human-loop translation tables.
+
+-- Upserts concept mappings, stores the translation event and links its mapping_ids
+-- in a single statement, so the API write path costs one round trip.
+CREATE OR REPLACE FUNCTION store_translation_event_with_mappings(
+    p_event JSONB,
+    p_mappings JSONB DEFAULT '[]'
+)
+RETURNS UUID AS $$
+    WITH upserts AS (
+        INSERT INTO concept_mappings (raw_term, concept_id, company_id, confidence_score,
+                                      successful_match_count, user_id)
+        SELECT DISTINCT ON (lower(m.raw_term), m.concept_id, m.company_id)
+               lower(m.raw_term), m.concept_id, m.company_id, m.confidence_score,
+               COALESCE(m.successful_match_count, 0), m.user_id
+        FROM jsonb_populate_recordset(NULL::concept_mappings, p_mappings) AS m
+        ON CONFLICT (raw_term_lc, concept_id, COALESCE(company_id, '00000000-0000-0000-0000-000000000000'::uuid))
+        DO UPDATE SET confidence_score = EXCLUDED.confidence_score,
+                      successful_match_count = EXCLUDED.successful_match_count
+        RETURNING id
+    ),
+    event AS (
+        INSERT INTO translation_events (application_id, role_analysis_id, user_id, event_type,
+                                        original_terms, translated_terms, claude_api_used,
+                                        api_cost, processing_time_ms)
+        SELECT e.application_id, e.role_analysis_id, e.user_id, COALESCE(e.event_type, 'success'),
+               e.original_terms, e.translated_terms, COALESCE(e.claude_api_used, false),
+               COALESCE(e.api_cost, 0.0), e.processing_time_ms
+        FROM jsonb_populate_record(NULL::translation_events, p_event) AS e
+        RETURNING id
+    ),
+    links AS (
+        INSERT INTO translation_event_mappings (translation_event_id, concept_mapping_id)
+        SELECT event.id, mapping_id::uuid
+        FROM event, jsonb_array_elements_text(COALESCE(p_event->'mapping_ids', '[]')) AS mapping_id
+    )
+    SELECT id FROM event;
+$$ LANGUAGE sql;
+
+-- Get-or-create lookups: one round trip on both hit and miss, existing rows are never
+-- overwritten, and a concurrent insert of the same key falls back to the winner's id.
+CREATE OR REPLACE FUNCTION get_or_create_user(p_email TEXT, p_attrs JSONB DEFAULT '{}')
+RETURNS UUID AS $$
+DECLARE
+    v_id UUID;
+BEGIN
+    SELECT id INTO v_id FROM users WHERE email = p_email;
+    IF v_id IS NULL THEN
+        INSERT INTO users (email, full_name, is_active)
+        SELECT p_email, a.full_name, COALESCE(a.is_active, true)
+        FROM jsonb_populate_record(NULL::users, p_attrs) AS a
+        ON CONFLICT (email) DO NOTHING
+        RETURNING id INTO v_id;
+    END IF;
+    IF v_id IS NULL THEN
+        SELECT id INTO v_id FROM users WHERE email = p_email;
+    END IF;
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION get_or_create_company(p_name TEXT, p_attrs JSONB DEFAULT '{}')
+RETURNS UUID AS $$
+DECLARE
+    v_id UUID;
+BEGIN
+    SELECT id INTO v_id FROM companies WHERE name = p_name;
+    IF v_id IS NULL THEN
+        INSERT INTO companies (name, domain, worldview_tags, language_patterns)
+        SELECT p_name, a.domain, COALESCE(a.worldview_tags, '{}'), COALESCE(a.language_patterns, '{}')
+        FROM jsonb_populate_record(NULL::companies, p_attrs) AS a
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id INTO v_id;
+    END IF;
+    IF v_id IS NULL THEN
+        SELECT id INTO v_id FROM companies WHERE name = p_name;
+    END IF;
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION get_or_create_concept(p_name TEXT)
+RETURNS UUID AS $$
+DECLARE
+    v_id UUID;
+BEGIN
+    SELECT id INTO v_id FROM concepts WHERE name = p_name;
+    IF v_id IS NULL THEN
+        INSERT INTO concepts (name) VALUES (p_name)
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id INTO v_id;
+    END IF;
+    IF v_id IS NULL THEN
+        SELECT id INTO v_id FROM concepts WHERE name = p_name;
+    END IF;
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Resolves the concept and the raw_term -> concept mapping in one call; an existing mapping
+-- (matched case-insensitively, any company) is returned as-is
+CREATE OR REPLACE FUNCTION get_or_create_concept_mapping(
+    p_raw_term TEXT,
+    p_concept_name TEXT,
+    p_confidence_score NUMERIC DEFAULT 0.5,
+    p_user_id UUID DEFAULT NULL,
+    p_company_id UUID DEFAULT NULL
+)
+RETURNS UUID AS $$
+DECLARE
+    v_concept_id UUID := get_or_create_concept(p_concept_name);
+    v_id UUID;
+BEGIN
+    SELECT id INTO v_id FROM concept_mappings
+    WHERE raw_term_lc = lower(p_raw_term) AND concept_id = v_concept_id
+    LIMIT 1;
+    IF v_id IS NULL THEN
+        INSERT INTO concept_mappings (raw_term, concept_id, confidence_score, user_id, company_id)
+        VALUES (p_raw_term, v_concept_id, p_confidence_score, p_user_id, p_company_id)
+        ON CONFLICT DO NOTHING
+        RETURNING id INTO v_id;
+    END IF;
+    IF v_id IS NULL THEN
+        SELECT id INTO v_id FROM concept_mappings
+        WHERE raw_term_lc = lower(p_raw_term) AND concept_id = v_concept_id
+        LIMIT 1;
+    END IF;
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Atomic successful_match_count bump; avoids the read-modify-write race between workers
+-- Returns the new count so callers never need a follow-up read
+DROP FUNCTION IF EXISTS increment_match_count(UUID);
+CREATE OR REPLACE FUNCTION increment_match_count(mapping_id UUID)
+RETURNS INTEGER AS $$
+    UPDATE concept_mappings
+    SET successful_match_count = COALESCE(successful_match_count, 0) + 1
+    WHERE id = mapping_id
+    RETURNING successful_match_count;
+$$ LANGUAGE sql;
+
+-- Cheap round trip for the API health check
+CREATE OR REPLACE FUNCTION ping()
+RETURNS INTEGER AS $$
+    SELECT 1;
+$$ LANGUAGE sql STABLE;
+
 -- Note: This is a sanitized schema for portfolio demonstration.
 -- Production includes additional constraints, triggers, and security policies.
\ No newline at end of file
@@ -5,7 +5,7 @@ Job storage module for tracking processed jobs and preventing duplicates.
 import json
 import os
 import logging
-from typing import Set, Dict, Any
+from typing import Set, Dict, Any, Iterable
 from datetime import datetime, timedelta
 
 
@@ -83,6 +83,22 @@ class JobStorage:
         self._save_processed_jobs()
         self.logger.debug(f"Marked job as processed: {job_id}")
     
+    def get_processed_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of job_ids that have already been processed."""
+        return {job_id for job_id in job_ids if job_id in self.processed_jobs}
+    
+    def mark_batch(self, job_ids: Iterable[str]):
+        """Mark several jobs as processed with a single save."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        
+        timestamp = datetime.now().isoformat()
+        for job_id in job_ids:
+            self.processed_jobs[job_id] = timestamp
+        self._save_processed_jobs()
+        self.logger.debug(f"Marked {len(job_ids)} jobs as processed")
+    
     def get_processed_job_count(self) -> int:
         """Get count of processed jobs."""
         return len(self.processed_jobs)
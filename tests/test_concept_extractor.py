@@ -0,0 +1,102 @@
+"""
+Equivalence tests for ConceptExtractor term matching against per-term regex search.
+"""
+
+import random
+import re
+
+import pytest
+
+from app.services import concept_extractor
+from app.services.concept_extractor import ConceptExtractor, _contains_term
+
+
+TERMS = [
+    "go", "golang", "c++", "c#", "node.js", "ci/cd", "a/b testing", "machine learning",
+    "learning", "api", "k8s", "data_pipeline", "café", "naïve bayes", "r", ".net"
+]
+
+TEXTS = [
+    "we use go, golang and c++ daily",
+    "experience with node.js or .net; ci/cd pipelines",
+    "a/b testing and machine learning (learning fast)",
+    "apis are not api, but api-first is",
+    "café owners and naïve bayes fans",
+    "data_pipeline vs data_pipelines vs data pipeline",
+    "gopher going go_lang r&d r",
+    "c#/c++ k8s",
+    ""
+]
+
+
+def regex_matches(text, terms):
+    """Reference result: terms found with re.search(rf"\\b{term}\\b")."""
+    return {term for term in terms if re.search(rf"\b{re.escape(term)}\b", text)}
+
+
+def build_extractor(terms):
+    """Extractor with one mapping per term, loaded without a database."""
+    extractor = ConceptExtractor(sb=None)
+    for index, term in enumerate(terms):
+        extractor._add_to_mapping_cache(term, f"concept_{index}", 0.9, f"mapping_{index}")
+    extractor._cache_valid = True
+    return extractor
+
+
+def matched_terms(extractor, text):
+    return {raw_term for raw_term, _, _ in extractor._match_terms(text)}
+
+
+def random_cases(seed, count):
+    """Short terms and texts over an alphabet mixing word and non-word characters."""
+    rng = random.Random(seed)
+    alphabet = "ab_1é .+-/"
+    terms = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3))).strip() for _ in range(30)}
+    terms = sorted(term for term in terms if term)
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+    return terms, texts
+
+
+@pytest.mark.skipif(concept_extractor.ahocorasick is None, reason="pyahocorasick not installed")
+@pytest.mark.parametrize("text", TEXTS)
+def test_automaton_matches_regex(text):
+    """The single Aho-Corasick pass finds exactly the terms a per-term \\b regex finds."""
+    extractor = build_extractor(TERMS)
+    assert extractor._automaton is not None
+    
+    assert matched_terms(extractor, text) == regex_matches(text, TERMS)
+
+
+@pytest.mark.skipif(concept_extractor.ahocorasick is None, reason="pyahocorasick not installed")
+def test_automaton_matches_regex_on_random_text():
+    terms, texts = random_cases(seed=7, count=500)
+    extractor = build_extractor(terms)
+    
+    for text in texts:
+        assert matched_terms(extractor, text) == regex_matches(text, terms), text
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_fallback_matches_regex(text, monkeypatch):
+    """Without pyahocorasick the per-term scan gives the same result."""
+    monkeypatch.setattr(concept_extractor, "ahocorasick", None)
+    extractor = build_extractor(TERMS)
+    assert extractor._automaton is None
+    
+    assert matched_terms(extractor, text) == regex_matches(text, TERMS)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("term", [term for term in TERMS if term.isascii()])
+def test_contains_term_matches_regex(text, term):
+    """The str.find scan agrees with re.search(rf"\\b{term}\\b") for ASCII terms."""
+    assert _contains_term(text, term) == bool(re.search(rf"\b{re.escape(term)}\b", text))
+
+
+def test_contains_term_matches_regex_on_random_text():
+    terms, texts = random_cases(seed=12, count=500)
+    
+    for text in texts:
+        for term in terms:
+            expected = bool(re.search(rf"\b{re.escape(term)}\b", text))
+            assert _contains_term(text, term) == expected, (text, term)
@@ -0,0 +1,54 @@
+"""
+Tests for batched processed-job tracking in JobStorage.
+"""
+
+import json
+import os
+
+import pytest
+
+from storage.job_storage import JobStorage
+
+
+@pytest.fixture
+def storage_file(tmp_path):
+    """Path to a fresh processed-jobs file."""
+    return os.path.join(tmp_path, "processed_jobs.json")
+
+
+def test_get_processed_ids_returns_only_known_ids(storage_file):
+    """Only IDs already marked processed are returned."""
+    storage = JobStorage(storage_file)
+    storage.mark_job_processed("lever_1")
+    
+    assert storage.get_processed_ids(["lever_1", "greenhouse_2"]) == {"lever_1"}
+    assert storage.get_processed_ids(job_id for job_id in ["greenhouse_2"]) == set()
+    assert storage.get_processed_ids([]) == set()
+
+
+def test_mark_batch_persists_all_ids_in_one_save(storage_file, monkeypatch):
+    """mark_batch records every ID and writes the storage file once."""
+    storage = JobStorage(storage_file)
+    saves = []
+    original_save = storage._save_processed_jobs
+    monkeypatch.setattr(storage, "_save_processed_jobs", lambda: saves.append(1) or original_save())
+    
+    storage.mark_batch(["lever_1", "greenhouse_2", "lever_3"])
+    
+    assert len(saves) == 1
+    with open(storage_file) as f:
+        assert set(json.load(f)) == {"lever_1", "greenhouse_2", "lever_3"}
+    
+    reloaded = JobStorage(storage_file)
+    assert reloaded.get_processed_ids(["lever_1", "lever_3", "other"]) == {"lever_1", "lever_3"}
+
+
+def test_mark_batch_with_no_ids_skips_save(storage_file):
+    """An empty batch leaves the storage file untouched."""
+    storage = JobStorage(storage_file)
+    
+    storage.mark_batch([])
+    storage.mark_batch(job_id for job_id in [])
+    
+    assert not os.path.exists(storage_file)
+    assert storage.get_processed_job_count() == 0
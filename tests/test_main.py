@@ -0,0 +1,86 @@
+"""
+Tests for JobApplicationSystem.process_jobs when Supabase analysis writes fail.
+"""
+
+import logging
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from storage.job_storage import JobStorage
+
+try:
+    import main
+except ImportError as e:
+    pytest.skip(f"main.py imports are unavailable: {e}", allow_module_level=True)
+
+
+class FakeMatcher:
+    """Treats every job as a PM role matching at 90%."""
+    
+    def is_product_manager_role(self, job):
+        return True
+    
+    def match_job(self, job):
+        return {"best_match_score": 90, "recommendation": "apply", "best_resume": "pm"}
+
+
+class FlakyRepo:
+    """store_job_analyses raises while down, then stores everything it is given."""
+    
+    def __init__(self, down_cycles):
+        self.down_cycles = down_cycles
+        self.calls = []
+    
+    def store_job_analyses(self, analyses):
+        self.calls.append([analysis["job_url"] for analysis in analyses])
+        if len(self.calls) <= self.down_cycles:
+            raise Exception("Supabase unavailable")
+        return [f"analysis_{i}" for i in range(len(analyses))]
+
+
+def build_system(tmp_path, repo):
+    system = main.JobApplicationSystem.__new__(main.JobApplicationSystem)
+    system.config = SimpleNamespace(MATCH_THRESHOLD=0.5)
+    system.logger = logging.getLogger("test_main")
+    system.keyword_matcher = FakeMatcher()
+    system.job_storage = JobStorage(os.path.join(tmp_path, "processed_jobs.json"))
+    system.repo = repo
+    system.extractor = None
+    system._unstored_analyses = []
+    return system
+
+
+def job(job_id):
+    return {"id": job_id, "title": "Product Manager", "company": "Acme",
+            "url": f"https://jobs.example/{job_id}", "description": "Own the roadmap"}
+
+
+def test_job_with_unstored_analysis_is_not_returned_again(tmp_path):
+    """A matched job is notified once even while its analysis write keeps failing."""
+    repo = FlakyRepo(down_cycles=2)
+    system = build_system(tmp_path, repo)
+    
+    first = system.process_jobs([job("lever_1")])
+    second = system.process_jobs([job("lever_1")])
+    
+    assert [matched["id"] for matched in first] == ["lever_1"]
+    assert second == []
+    assert system.job_storage.get_processed_ids(["lever_1"]) == {"lever_1"}
+
+
+def test_unstored_analysis_is_retried_next_cycle(tmp_path):
+    """Failed analyses are resent with the next cycle's batch until stored."""
+    repo = FlakyRepo(down_cycles=1)
+    system = build_system(tmp_path, repo)
+    
+    system.process_jobs([job("lever_1")])
+    system.process_jobs([job("lever_1"), job("lever_2")])
+    system.process_jobs([])
+    
+    assert repo.calls == [
+        ["https://jobs.example/lever_1"],
+        ["https://jobs.example/lever_1", "https://jobs.example/lever_2"]
+    ]
+    assert system._unstored_analyses == []
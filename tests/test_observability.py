@@ -0,0 +1,67 @@
+"""
+Tests for Histogram count/sum/avg and nearest-rank percentiles.
+"""
+
+import math
+import random
+from fractions import Fraction
+
+import pytest
+
+from app.services.observability import Histogram
+
+
+def nearest_rank(samples, pct):
+    """Reference percentile: the ceil(pct/100 * n)-th smallest sample (1-based)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(Fraction(pct, 100) * len(ordered)))
+    return ordered[rank - 1]
+
+
+def test_empty_histogram_summary():
+    assert Histogram().summary() == {"count": 0, "sum": 0.0, "avg": 0, "p50": 0, "p99": 0}
+
+
+@pytest.mark.parametrize("n, p50, p99", [
+    (1, 1, 1),
+    (2, 1, 2),
+    (10, 5, 10),
+    (100, 50, 99),
+    (101, 51, 100),
+    (1000, 500, 990)
+])
+def test_percentiles_of_one_to_n(n, p50, p99):
+    histogram = Histogram()
+    for value in random.Random(n).sample(range(1, n + 1), n):
+        histogram.add(value)
+    
+    summary = histogram.summary()
+    assert (summary["p50"], summary["p99"]) == (p50, p99)
+    assert summary["count"] == n
+    assert summary["avg"] == pytest.approx((n + 1) / 2)
+
+
+def test_percentiles_match_sorted_samples():
+    rng = random.Random(6)
+    
+    for _ in range(200):
+        samples = [rng.uniform(0, 500) for _ in range(rng.randint(1, 300))]
+        histogram = Histogram()
+        for value in samples:
+            histogram.add(value)
+        
+        summary = histogram.summary()
+        assert summary["p50"] == nearest_rank(samples, 50)
+        assert summary["p99"] == nearest_rank(samples, 99)
+
+
+def test_percentiles_use_recent_window_and_totals_use_every_sample():
+    histogram = Histogram(max_samples=100)
+    for value in range(1, 1001):
+        histogram.add(value)
+    
+    summary = histogram.summary()
+    assert summary["count"] == 1000
+    assert summary["sum"] == sum(range(1, 1001))
+    assert summary["p50"] == nearest_rank(range(901, 1001), 50) == 950
+    assert summary["p99"] == nearest_rank(range(901, 1001), 99) == 999
@@ -0,0 +1,49 @@
+"""
+Equivalence tests for ResumeDeltaService bullet similarity against plain set Jaccard.
+"""
+
+import random
+
+import pytest
+
+from app.services.resume_delta_service import ResumeDeltaService
+
+
+def jaccard_similar(words1, words2, threshold):
+    """Reference result: |A & B| / |A | B| >= threshold, False when either set is empty."""
+    if not words1 or not words2:
+        return False
+    return len(words1 & words2) / len(words1 | words2) >= threshold
+
+
+@pytest.fixture
+def service():
+    return ResumeDeltaService(sb=None)
+
+
+@pytest.mark.parametrize("words1, words2", [
+    (set(), set()),
+    ({"a"}, set()),
+    ({"a"}, {"a"}),
+    ({"a", "b", "c"}, {"a"}),
+    ({"a", "b", "c", "d"}, {"a", "b", "c", "d", "e", "f", "g", "h", "i", "j"}),
+    ({"led", "migration", "to", "kubernetes"}, {"led", "migration", "of", "services", "to", "kubernetes"}),
+    ({"x"}, {"y"})
+])
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.4, 0.5, 1.0])
+def test_word_sets_similar_matches_jaccard(service, words1, words2, threshold):
+    assert service._word_sets_similar(frozenset(words1), frozenset(words2), threshold) == \
+        jaccard_similar(words1, words2, threshold)
+
+
+def test_word_sets_similar_matches_jaccard_on_random_sets(service):
+    """The size-ratio pruning never changes the outcome of the full Jaccard check."""
+    rng = random.Random(3)
+    vocabulary = [f"w{i}" for i in range(12)]
+    
+    for _ in range(2000):
+        words1 = frozenset(rng.sample(vocabulary, rng.randint(0, 12)))
+        words2 = frozenset(rng.sample(vocabulary, rng.randint(0, 12)))
+        threshold = rng.choice([0.1, 0.25, 0.3, 0.5, 0.75])
+        assert service._word_sets_similar(words1, words2, threshold) == \
+            jaccard_similar(words1, words2, threshold), (words1, words2, threshold)
@@ -110,6 +110,52 @@ def test_schema_includes_audit_timestamps():
         "Schema should include updated_at timestamps"
 
 
+def test_schema_includes_rpc_functions():
+    """Verify server-side RPC functions used by the repository are present."""
+    schema_path = os.path.join(os.path.dirname(__file__), '..', 'sql', 'schema.sql')
+    
+    with open(schema_path, 'r') as f:
+        schema_content = f.read().lower()
+    
+    expected_functions = [
+        'store_translation_event_with_mappings',
+        'get_or_create_user',
+        'get_or_create_company',
+        'get_or_create_concept',
+        'get_or_create_concept_mapping',
+        'increment_match_count',
+        'ping'
+    ]
+    
+    for function in expected_functions:
+        assert f'create or replace function {function}(' in schema_content, \
+            f"Schema should define {function} function"
+
+
+def test_schema_fixed_defines_repository_rpcs():
+    """Verify schema_fixed.sql (canonical for RPCs) defines every RPC the code calls."""
+    root = os.path.join(os.path.dirname(__file__), '..')
+    
+    with open(os.path.join(root, 'schema_fixed.sql'), 'r') as f:
+        schema_content = f.read().lower()
+    
+    called_functions = set()
+    for package in ['app', 'api_clients', 'matching', 'storage']:
+        for dirpath, _, filenames in os.walk(os.path.join(root, package)):
+            for filename in filenames:
+                if filename.endswith('.py'):
+                    with open(os.path.join(dirpath, filename), 'r') as f:
+                        called_functions.update(re.findall(r'\.rpc\(\s*["\'](\w+)["\']', f.read()))
+    
+    # Needs the human-loop translation tables, which only the Rev A schema defines
+    rev_a_only = {'store_translation_event_with_mappings'}
+    
+    assert 'ping' in called_functions, "Expected to find the health check RPC call"
+    for function in sorted(called_functions - rev_a_only):
+        assert f'create or replace function {function}(' in schema_content, \
+            f"schema_fixed.sql should define {function} function"
+
+
 def test_demo_data_files_exist():
     """Verify demo data files are present."""
     demo_path = os.path.join(os.path.dirname(__file__), '..', 'demo', 'data')